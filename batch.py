@@ -0,0 +1,425 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import multiprocessing
+import os
+import threading
+import time
+
+from renderer import barcode_cache, compile_layout, render_gift_card, card_filename
+from output import (
+    ARCHIVE_SINKS, OUTPUT_SINKS, ArchiveSink, CardIndex, OutputSettings, PNGEncoderPool, PNGWriterPool,
+    entry_name, index_path
+)
+from imposition import SheetWriter, TilePool, sheet_geometry
+from manifest import RunManifest, layout_hash
+from profiling import CardSampler, ProfileSettings, StageProfiler, cprofile_part_path, install_profiler, merge_snapshots
+from vector import VectorSink
+
+# --- Batch Rendering Engine ---
+# Rows are (card_number, barcode_data, member_number, verification_code) tuples.
+# Results are (card_number, filename, error, skipped) tuples where exactly one
+# of filename/error is None. Rendered cards are yielded in the same order as
+# the input rows; with a resumed run journal, cards that are already up to
+# date are yielded with skipped=True as soon as their rows are read. When
+# cards are imposed onto print sheets, filename is the "sheets.pdf p.N" page,
+# and with archive sinks it is the "gift_cards.zip:entry" location. Vector
+# cards report their SVG file name or "gift_cards.pdf p.N" page.
+# Pass a dict as render_batch(stats=...) to receive per-batch counters such as
+# stats["barcode_cache"] = (hits, misses) once the batch finishes. When
+# profiling is enabled, stats["profile"] also receives the merged stage
+# timings of every rendering process (see profiling.py).
+
+_worker_state = {}
+
+# Workers are spawned, never forked: the GUI starts batches from a worker
+# thread while the Tk and preview threads may hold the renderer's cache locks,
+# and a forked child would inherit them locked. Workers build all their state
+# in _init_worker, so nothing relies on fork.
+WORKER_START_METHOD = "spawn"
+
+def resolve_worker_count(workers):
+    """Resolve the configured worker count, 0 meaning one per CPU core"""
+    if not workers or workers < 1:
+        return os.cpu_count() or 1
+    return workers
+
+def render_card(compiled, row):
+    """Render one row, returning (filename, RenderedCard)"""
+    card_number, barcode_data, member_number, verification_code = row
+    card = render_gift_card(
+        compiled,
+        barcode_data,
+        member_number,
+        verification_code,
+        card_number
+    )
+    return card_filename(member_number, card_number), card
+
+def _write_result(card_number, filename, write):
+    """Turn a pending write (a Future or an error message) into a
+    (card_number, filename, error, content_hash) tuple"""
+    if isinstance(write, str):
+        return card_number, None, write, None
+    try:
+        content_hash = write.result()
+        return card_number, filename, None, content_hash
+    except Exception as e:
+        return card_number, None, str(e), None
+
+def render_rows(compiled, output_path, writer, rows, sampler=None):
+    """Render rows and hand them to the writer pool, yielding results in row order.
+
+    Results are released as soon as the writes at the head of the line have
+    finished, so progress keeps flowing while later cards are still encoding.
+    A CardSampler, when given, runs the first cards under cProfile.
+    """
+    pending = deque()
+    for row in rows:
+        filename = None
+        try:
+            if sampler is not None:
+                filename, card = sampler.run(render_card, compiled, row)
+            else:
+                filename, card = render_card(compiled, row)
+            filename = entry_name(writer.settings, row[0], filename)
+            write = writer.submit(card, os.path.join(output_path, filename))
+        except Exception as e:
+            write = str(e)
+        pending.append((row[0], filename, write))
+
+        while pending and (isinstance(pending[0][2], str) or pending[0][2].done()):
+            yield _write_result(*pending.popleft())
+        # Don't let finished results pile up behind one slow write
+        if len(pending) > 2 * writer.settings.queue_size:
+            yield _write_result(*pending.popleft())
+
+    while pending:
+        yield _write_result(*pending.popleft())
+
+def _start_profiling(profile, output_path):
+    """Install a stage profiler and cProfile sampler in this process, as enabled"""
+    profiler = StageProfiler() if profile.enabled else None
+    install_profiler(profiler)
+    sampler = None
+    if profile.cprofile_cards > 0:
+        sampler = CardSampler(profile.cprofile_cards, cprofile_part_path(output_path))
+    return profiler, sampler
+
+def _make_writer(output_settings, imposition):
+    """PNG files normally; packed sheet tiles when imposing, in-memory PNGs for archives"""
+    if imposition is not None:
+        return TilePool(output_settings, sheet_geometry(imposition))
+    if output_settings.sink in ARCHIVE_SINKS:
+        return PNGEncoderPool(output_settings)
+    return PNGWriterPool(output_settings)
+
+def _init_worker(layout, background_path, output_path, output_settings, profile, imposition):
+    """Compile the layout and set up the writer pool once per worker process"""
+    _worker_state["compiled"] = compile_layout(layout, background_path)
+    _worker_state["output_path"] = output_path
+    _worker_state["writer"] = _make_writer(output_settings, imposition)
+    _worker_state["profiler"], _worker_state["sampler"] = _start_profiling(profile, output_path)
+    # Count only this worker's lookups, however the process was started
+    barcode_cache.reset_counters()
+
+def _render_chunk(chunk):
+    """Render a chunk of rows inside a worker process.
+
+    Returns (results, pid, barcode cache counters, profiler snapshot or None)
+    so the parent can total the statistics of every worker.
+    """
+    sampler = _worker_state["sampler"]
+    results = list(render_rows(
+        _worker_state["compiled"],
+        _worker_state["output_path"],
+        _worker_state["writer"],
+        chunk,
+        sampler
+    ))
+    if sampler is not None:
+        sampler.flush()
+    profiler = _worker_state["profiler"]
+    return results, os.getpid(), barcode_cache.counters(), profiler.snapshot() if profiler else None
+
+def _chunked(rows, chunk_size):
+    """Split an iterable of rows into lists of at most chunk_size rows"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def format_duration(seconds):
+    """Format a duration as 1h02m, 3m05s or 42s"""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
+
+class BatchProgress:
+    """Thread-safe batch counters with throughput and ETA estimates.
+
+    The rendering thread calls record() per result; any other thread may read
+    snapshot() or describe() at its own pace.
+    """
+
+    def __init__(self, total=None):
+        self.total = total
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, error=None, skipped=False):
+        """Count one finished card; skipped cards count as done but not towards the rate"""
+        with self._lock:
+            if error:
+                self.failed += 1
+            elif skipped:
+                self.skipped += 1
+            else:
+                self.succeeded += 1
+
+    def snapshot(self):
+        """Return a dict of counters, cards/sec and the estimated seconds remaining"""
+        with self._lock:
+            succeeded, failed, skipped = self.succeeded, self.failed, self.skipped
+        done = succeeded + failed + skipped
+        elapsed = time.monotonic() - self.started
+        # Skipping is nearly free, so only rendered cards predict the time left
+        rate = (succeeded + failed) / elapsed if elapsed > 0 else 0.0
+        # The row count is an estimate, so never show fewer cards than processed
+        total = max(self.total or 0, done) if self.total is not None else None
+        eta = (total - done) / rate if total is not None and rate > 0 else None
+        return {
+            "done": done,
+            "succeeded": succeeded,
+            "failed": failed,
+            "skipped": skipped,
+            "total": total,
+            "elapsed": elapsed,
+            "rate": rate,
+            "eta": eta
+        }
+
+    def describe(self):
+        """One-line progress summary for status labels and console output"""
+        snap = self.snapshot()
+        total = snap["total"] if snap["total"] is not None else "?"
+        text = f"Progress: {snap['succeeded']}/{total} cards generated"
+        if snap["skipped"]:
+            text += f", {snap['skipped']} up to date"
+        if snap["failed"]:
+            text += f", {snap['failed']} failed"
+        text += f" · {snap['rate']:.1f} cards/s"
+        if snap["eta"] is not None:
+            text += f" · ETA {format_duration(snap['eta'])}"
+        return text
+
+def describe_cache_stats(name, counters):
+    """Format (hits, misses) counters for the log"""
+    hits, misses = counters
+    lookups = hits + misses
+    rate = (hits / lookups * 100) if lookups else 0.0
+    return f"📊 {name}: {hits} hits, {misses} misses ({rate:.0f}% hit rate)"
+
+def unresumable_output(checkpoint, output_settings, imposition=None, vector=None):
+    """Why a batch asking to resume can't be resumed, or None if it can (or doesn't ask)"""
+    if checkpoint is None or not checkpoint.resume:
+        return None
+    if not checkpoint.journal:
+        return "Can't resume without the run journal (checkpoint.journal is off)"
+    if vector is not None and vector.enabled:
+        output = "vector output"
+    elif imposition is not None and imposition.enabled:
+        output = "print sheets"
+    elif output_settings.sink in ARCHIVE_SINKS:
+        output = f"the {output_settings.sink} sink"
+    else:
+        return None
+    return f"Can't resume {output}: only PNG files and sharded folders are journaled"
+
+def render_batch(rows, layout, background_path, output_path, workers=0, chunk_size=64, stats=None, output_settings=None, profile=None, checkpoint=None, imposition=None, vector=None):
+    """Render rows to PNG files on a process pool, yielding results in row order.
+
+    At most two chunks per worker are in flight at any time so rows can be
+    consumed lazily. With a single worker everything runs in-process. The
+    layout is compiled once per process before the first card, and every
+    process writes its PNGs through its own PNGWriterPool. Pass
+    ProfileSettings as profile to time stages or sample cards with cProfile,
+    and CheckpointSettings as checkpoint to journal finished cards in the
+    output folder and, when resuming, skip the ones that are still current.
+    With enabled ImpositionSettings, cards are tiled onto print sheets in one
+    multi-page file instead of being written as PNGs. Archive sinks in
+    output_settings stream the PNGs into one ZIP or TAR file instead. With
+    enabled VectorSettings, cards are written as SVG files or pages of one
+    PDF in this process, with no rasterizing. None of these are journaled, so
+    resuming them raises ValueError.
+    """
+    output_settings = output_settings or OutputSettings()
+    if output_settings.sink not in OUTPUT_SINKS:
+        raise ValueError(f"Unknown output sink: {output_settings.sink} (choose from {', '.join(OUTPUT_SINKS)})")
+    unresumable = unresumable_output(checkpoint, output_settings, imposition, vector)
+    if unresumable:
+        raise ValueError(unresumable)
+    args = (layout, background_path, output_path, workers, chunk_size, stats, output_settings, profile)
+
+    if vector is not None and vector.enabled:
+        if imposition is not None and imposition.enabled:
+            raise ValueError("Vector output can't be imposed onto print sheets")
+        with VectorSink(vector, layout, background_path, output_path) as sink:
+            yield from _render_vector(sink, rows)
+        if stats is not None:
+            stats["vector"] = (sink.path, sink.count)
+        return
+
+    if imposition is not None and imposition.enabled:
+        # Raises ValueError for impossible sheet setups before any card is rendered
+        geometry = sheet_geometry(imposition)
+        sheets = SheetWriter(imposition, output_path, geometry)
+        yield from _render_into(sheets, rows, *args, imposition)
+        if stats is not None:
+            stats["sheets"] = (sheets.path, sheets.pages, geometry)
+        return
+
+    if output_settings.sink in ARCHIVE_SINKS:
+        archive = ArchiveSink(output_settings, output_path)
+        yield from _render_into(archive, rows, *args)
+        if stats is not None:
+            stats["archive"] = (archive.path, archive.count)
+        return
+
+    index = CardIndex(index_path(output_path)) if output_settings.sink == "sharded" else None
+    try:
+        for card_number, filename, error, skipped, content_hash in _render_files(rows, checkpoint, *args):
+            if index is not None and not error:
+                index.add(card_number, filename, content_hash)
+            yield card_number, filename, error, skipped
+    finally:
+        if index is not None:
+            index.close()
+
+def _render_vector(sink, rows):
+    """Lay out rows as vector cards in this process; they are far cheaper than a PNG encode"""
+    for row in rows:
+        try:
+            yield row[0], sink.add(row), None, False
+        except Exception as e:
+            yield row[0], None, str(e), False
+
+def _render_files(rows, checkpoint, layout, background_path, output_path, workers, chunk_size, stats, output_settings, profile):
+    """Render rows to PNG files, journaling them when checkpointing is on.
+
+    Yields (card_number, filename, error, skipped, content_hash).
+    """
+    args = (layout, background_path, output_path, workers, chunk_size, stats, output_settings, profile)
+    if checkpoint is None or not checkpoint.journal:
+        for card_number, filename, error, content_hash in _render_results(rows, *args):
+            yield card_number, filename, error, False, content_hash
+        return
+
+    with RunManifest(
+        output_path,
+        layout_hash(layout, background_path),
+        resume=checkpoint.resume,
+        commit_every=checkpoint.commit_every
+    ) as manifest:
+        for card_number, filename, error, content_hash in _render_results(manifest.filter_rows(rows), *args):
+            for skipped_number, skipped_filename, skipped_hash in manifest.drain_skipped():
+                yield skipped_number, skipped_filename, None, True, skipped_hash
+            if error:
+                manifest.forget(card_number)
+            else:
+                manifest.record(card_number, filename, content_hash)
+            yield card_number, filename, error, False, content_hash
+        for skipped_number, skipped_filename, skipped_hash in manifest.drain_skipped():
+            yield skipped_number, skipped_filename, None, True, skipped_hash
+        if stats is not None:
+            stats["skipped"] = manifest.skipped
+
+def _render_into(sink, rows, *args):
+    """Render rows and hand every card's payload to a parent-side sink in row order.
+
+    The sink's add() returns the location reported as the result's filename.
+    """
+    with sink:
+        for card_number, filename, error, payload in _render_results(rows, *args):
+            if error:
+                yield card_number, None, error, False
+                continue
+            try:
+                yield card_number, sink.add(card_number, filename, payload), None, False
+            except Exception as e:
+                yield card_number, None, str(e), False
+
+def _render_results(rows, layout, background_path, output_path, workers, chunk_size, stats, output_settings, profile, imposition=None):
+    """Render rows, yielding (card_number, filename, error, payload) in row order.
+
+    payload is the PNG's content hash, (content hash, PNG bytes) for archive
+    sinks, or the packed tile when imposing.
+    """
+    workers = resolve_worker_count(workers)
+    chunk_size = max(1, chunk_size)
+    output_settings = output_settings or OutputSettings()
+    profile = profile or ProfileSettings()
+    # Compile here first: a bad background or layout then raises its own error
+    # instead of breaking the pool from inside every worker's initializer
+    compiled = compile_layout(layout, background_path)
+
+    if workers == 1:
+        start_hits, start_misses = barcode_cache.counters()
+        profiler, sampler = _start_profiling(profile, output_path)
+        try:
+            with _make_writer(output_settings, imposition) as writer:
+                yield from render_rows(compiled, output_path, writer, rows, sampler)
+        finally:
+            install_profiler(None)
+            if sampler is not None:
+                sampler.flush()
+        if stats is not None:
+            hits, misses = barcode_cache.counters()
+            stats["barcode_cache"] = (hits - start_hits, misses - start_misses)
+            if profiler is not None:
+                stats["profile"] = profiler.snapshot()
+        return
+
+    # Counters and profiles are cumulative per worker process, so keep the latest per pid
+    worker_counters = {}
+    worker_profiles = {}
+
+    def collect(future):
+        results, pid, counters, profile_snapshot = future.result()
+        worker_counters[pid] = counters
+        if profile_snapshot is not None:
+            worker_profiles[pid] = profile_snapshot
+        return results
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(WORKER_START_METHOD),
+        initializer=_init_worker,
+        initargs=(layout, background_path, output_path, output_settings, profile, imposition)
+    ) as executor:
+        pending = deque()
+        for chunk in _chunked(rows, chunk_size):
+            pending.append(executor.submit(_render_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from collect(pending.popleft())
+        while pending:
+            yield from collect(pending.popleft())
+
+    if stats is not None:
+        stats["barcode_cache"] = (
+            sum(hits for hits, _ in worker_counters.values()),
+            sum(misses for _, misses in worker_counters.values())
+        )
+        if worker_profiles:
+            stats["profile"] = merge_snapshots(worker_profiles.values())
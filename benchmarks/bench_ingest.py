@@ -0,0 +1,74 @@
+"""Compare per-row ingestion overhead of DataFrame.iterrows() and load_card_rows.
+
+Usage:
+    python benchmarks/bench_ingest.py [--rows 1000000] [--keep]
+
+Writes a synthetic CSV with the default column names plus a few unused
+columns, then walks it both ways without rendering anything.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datasource import load_card_rows
+
+COLUMNS = ("barcode", "member_number", "pin")
+
+def write_csv(path, rows):
+    """Write a synthetic card data file with some extra columns"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("barcode,member_number,pin,issued,notes\n")
+        for i in range(rows):
+            f.write(f"{1234567890123 + i},{10000 + i},P{i:07d},2024-01-01,batch\n")
+
+def iterrows_feed(path):
+    """The previous loop: full DataFrame load and one Series per row"""
+    df = pd.read_csv(path)
+    for index, row in df.iterrows():
+        yield index + 1, row[COLUMNS[0]], row[COLUMNS[1]], row[COLUMNS[2]]
+
+def columnar_feed(path):
+    """The streaming, string-typed feed used by the generator"""
+    _, rows = load_card_rows(path, *COLUMNS)
+    return rows
+
+def time_feed(feed, path):
+    """Consume a feed, returning (seconds, row_count, first_row)"""
+    start = time.perf_counter()
+    count = 0
+    first = None
+    for row in feed(path):
+        if first is None:
+            first = row
+        count += 1
+    return time.perf_counter() - start, count, first
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows in the synthetic CSV")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated CSV")
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        write_csv(path, args.rows)
+        print(f"Rows: {args.rows}  File: {os.path.getsize(path) / 1e6:.1f} MB")
+        for name, feed in [("iterrows", iterrows_feed), ("columnar", columnar_feed)]:
+            seconds, count, first = time_feed(feed, path)
+            per_row = seconds / max(count, 1) * 1e6
+            print(f"{name:>9}: {seconds:8.2f} s  {per_row:7.2f} us/row  first row: {first}")
+    finally:
+        if args.keep:
+            print(f"Kept {path}")
+        else:
+            os.remove(path)
+
+if __name__ == "__main__":
+    main()
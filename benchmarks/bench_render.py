@@ -0,0 +1,217 @@
+"""Measure card rendering throughput stage by stage and report it as JSON.
+
+Usage:
+    python benchmarks/bench_render.py [--rows 1000,100000,1000000]
+        [--resolutions 1011x638,2022x1276,4044x2552] [--background card.png]
+        [--layout layout.json] [--cards 200] [--output results.json]
+
+Ingestion is timed over synthetic CSVs of every requested size. Rendering is
+timed on a sample of cards per background through render_gift_card's own
+stage markers, folded into these steps, plus the PNG writer's encode:
+
+    barcode    generate_barcode with a cold cache (encode + rasterize)
+    composite  card template copy and barcode paste (and the RGB convert for
+               backgrounds with transparency)
+    text       measuring the text block and drawing the values
+    png_encode the writer's CardEncoder with the configured PNG options, so
+               cards on opaque backgrounds only compress their changed bands
+
+Synthetic backgrounds are generated for each --resolutions entry; pass
+--background (repeatable) to measure real templates instead. The JSON goes to
+--output or stdout, and a readable summary is printed to stderr.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, replace
+
+import PIL
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_ingest import COLUMNS, write_csv
+from config import CONFIG
+from cli import load_layout
+from datasource import load_card_rows
+from output import CardEncoder, OutputSettings
+from profiling import StageProfiler, install_profiler
+from renderer import barcode_cache, compile_layout, render_gift_card
+
+DEFAULT_ROWS = "1000,100000,1000000"
+DEFAULT_RESOLUTIONS = "1011x638,2022x1276,4044x2552"  # CR80 card at 300, 600 and 1200 dpi
+STAGES = ("barcode", "composite", "text", "png_encode")
+
+# Renderer stages folded into each benchmark stage
+RENDER_STAGES = {
+    "barcode": ("barcode",),
+    "composite": ("background", "composite", "convert"),
+    "text": ("layout", "text")
+}
+
+def parse_list(text, convert):
+    """Parse a comma separated option value"""
+    return [convert(item.strip()) for item in text.split(",") if item.strip()]
+
+def parse_resolution(text):
+    """Parse WIDTHxHEIGHT into a (width, height) tuple"""
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+def write_background(path, size):
+    """Write a synthetic background with smooth gradients and fractal detail.
+
+    Like printed artwork it has both flat areas and fine structure; pure noise
+    would make PNG encoding far slower than any real template.
+    """
+    gradient = Image.linear_gradient("L").resize(size)
+    radial = Image.radial_gradient("L").resize(size)
+    detail = Image.effect_mandelbrot(size, (-2.0, -1.2, 1.0, 1.2), 64)
+    Image.merge("RGB", (gradient, radial, detail)).save(path, "PNG")
+
+def time_ingestion(path):
+    """Consume load_card_rows over a file, returning (seconds, row_count)"""
+    start = time.perf_counter()
+    _, rows = load_card_rows(path, *COLUMNS)
+    count = sum(1 for _ in rows)
+    return time.perf_counter() - start, count
+
+def render_stages(compiled, row, encoder):
+    """Render one card with render_gift_card, returning seconds per stage"""
+    card_number, barcode_data, member_number, verification_code = row
+    profiler = StageProfiler()
+    install_profiler(profiler)
+    try:
+        card = render_gift_card(compiled, barcode_data, member_number, verification_code, card_number)
+    finally:
+        install_profiler(None)
+    stages = profiler.snapshot()["stages"]
+    timings = {
+        stage: sum(stages[name]["total_s"] for name in names if name in stages)
+        for stage, names in RENDER_STAGES.items()
+    }
+
+    start = time.perf_counter()
+    encoder.encode(card)
+    timings["png_encode"] = time.perf_counter() - start
+    return timings
+
+def summarize(samples):
+    """Summarize a list of seconds as microsecond statistics"""
+    ordered = sorted(samples)
+    return {
+        "mean_us": statistics.fmean(ordered) * 1e6,
+        "median_us": statistics.median(ordered) * 1e6,
+        "p95_us": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1e6,
+        "total_s": sum(ordered)
+    }
+
+def bench_render(layout, background_path, rows, output_settings):
+    """Time every stage over the sample rows for one background"""
+    compiled = compile_layout(layout, background_path)
+    encoder = CardEncoder(output_settings)
+    # Warm the template caches and fonts so the first card isn't an outlier
+    render_stages(compiled, rows[0], encoder)
+    barcode_cache.clear()
+
+    samples = {stage: [] for stage in STAGES}
+    for row in rows:
+        for stage, seconds in render_stages(compiled, row, encoder).items():
+            samples[stage].append(seconds)
+
+    stages = {stage: summarize(values) for stage, values in samples.items()}
+    per_card = sum(stage["mean_us"] for stage in stages.values()) / 1e6
+    return {
+        "background": os.path.basename(background_path),
+        "size": list(compiled.size),
+        "cards": len(rows),
+        "stages": stages,
+        "per_card_us": per_card * 1e6,
+        "cards_per_sec": 1 / per_card if per_card else None
+    }
+
+def environment():
+    """Describe the machine and library versions the numbers came from"""
+    return {
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default=DEFAULT_ROWS, help=f"Comma separated CSV sizes (default: {DEFAULT_ROWS})")
+    parser.add_argument("--resolutions", default=DEFAULT_RESOLUTIONS,
+                        help=f"Comma separated synthetic background sizes (default: {DEFAULT_RESOLUTIONS})")
+    parser.add_argument("--background", action="append", default=[],
+                        help="Real background image to measure instead of synthetic ones (repeatable)")
+    parser.add_argument("--layout", help="JSON layout file, as used by main.py render")
+    parser.add_argument("--cards", type=int, default=200, help="Cards rendered per background")
+    parser.add_argument("--fast-png", action="store_true", help="Measure the fast PNG setting")
+    parser.add_argument("--output", help="Write the JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    layout = load_layout(args.layout)
+    output_settings = OutputSettings.from_config(CONFIG)
+    if args.fast_png:
+        output_settings = replace(output_settings, fast=True)
+    results = {
+        "environment": environment(),
+        "layout": asdict(layout),
+        "png_options": dict(output_settings.save_options(), strip_rows=output_settings.strip_rows),
+        "ingestion": [],
+        "render": []
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for row_count in parse_list(args.rows, int):
+            path = os.path.join(workdir, f"rows_{row_count}.csv")
+            write_csv(path, row_count)
+            seconds, count = time_ingestion(path)
+            results["ingestion"].append({
+                "rows": count,
+                "file_mb": os.path.getsize(path) / 1e6,
+                "seconds": seconds,
+                "us_per_row": seconds / max(count, 1) * 1e6,
+                "rows_per_sec": count / seconds if seconds else None
+            })
+            os.remove(path)
+            print(f"ingest {count:>9} rows: {seconds:8.2f} s", file=sys.stderr)
+
+        # Render samples come from the same synthetic data, read the normal way
+        sample_path = os.path.join(workdir, "sample.csv")
+        write_csv(sample_path, max(1, args.cards))
+        _, rows = load_card_rows(sample_path, *COLUMNS)
+        rows = list(rows)
+
+        backgrounds = list(args.background)
+        if not backgrounds:
+            for size in parse_list(args.resolutions, parse_resolution):
+                path = os.path.join(workdir, f"background_{size[0]}x{size[1]}.png")
+                write_background(path, size)
+                backgrounds.append(path)
+
+        for background_path in backgrounds:
+            result = bench_render(layout, background_path, rows, output_settings)
+            results["render"].append(result)
+            stages = "  ".join(f"{stage} {result['stages'][stage]['mean_us'] / 1000:6.2f} ms" for stage in STAGES)
+            print(f"render {result['size'][0]}x{result['size'][1]}: {result['cards_per_sec']:7.1f} cards/s per core  {stages}",
+                  file=sys.stderr)
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+if __name__ == "__main__":
+    main()
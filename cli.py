@@ -0,0 +1,225 @@
+import argparse
+import json
+import os
+import sys
+from dataclasses import replace
+
+from config import CONFIG
+from renderer import CardLayout, compile_layout
+from datasource import load_card_rows
+from batch import BatchProgress, describe_cache_stats, render_batch, unresumable_output
+from imposition import SHEET_FORMATS, SHEET_SIZES_MM, ImpositionSettings, describe_card_fit, describe_sheets, sheet_geometry
+from manifest import CheckpointSettings
+from output import OUTPUT_SINKS, OutputSettings, describe_output
+from preflight import PreflightSettings, describe_preflight, preflight_data_file
+from profiling import TRACE_FORMATS, ProfileSettings, report_profile
+from vector import VECTOR_FORMATS, VectorSettings, describe_vector, validate_vector
+
+# --- Headless Batch Rendering ---
+# Everything here must stay importable without customtkinter or tkinter so
+# batches can run on render boxes and from cron.
+
+def build_parser():
+    """Build the argument parser for the render command"""
+    rendering = CONFIG.get('rendering', {})
+    parser = argparse.ArgumentParser(
+        prog="main.py render",
+        description="Render gift cards from a data file without starting the GUI."
+    )
+    parser.add_argument("--data", required=True, help="CSV or Excel file with card data")
+    parser.add_argument("--background", required=True, help="Background image for every card")
+    parser.add_argument("--layout", help="JSON file with layout settings (defaults match the GUI)")
+    parser.add_argument("--out", required=True, help="Output folder for generated cards")
+    parser.add_argument("--barcode-col", default="barcode", help="Barcode column name (default: barcode)")
+    parser.add_argument("--member-col", default="member_number", help="Card number column name (default: member_number)")
+    parser.add_argument("--pin-col", default="pin", help="Verification code column name (default: pin)")
+    parser.add_argument("--workers", type=int, default=rendering.get('workers', 0),
+                        help="Rendering processes, 0 for one per CPU core")
+    parser.add_argument("--chunk-size", type=int, default=rendering.get('chunk_size', 64),
+                        help="Cards sent to a rendering process at a time")
+    parser.add_argument("--compress-level", type=int, choices=range(10), metavar="0-9",
+                        help="PNG zlib compression level (default from config.json)")
+    parser.add_argument("--fast-png", action="store_true",
+                        help="Use the fastest PNG compression at the cost of larger files")
+    parser.add_argument("--sink", choices=OUTPUT_SINKS,
+                        help="Write loose files, sharded subfolders, or one ZIP/TAR archive (default from config.json)")
+    parser.add_argument("--shard-size", type=int,
+                        help="Cards per subfolder for --sink sharded (default from config.json)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time every rendering stage and write a trace to the output folder")
+    parser.add_argument("--profile-format", choices=TRACE_FORMATS,
+                        help="Profile trace format (default from config.json)")
+    parser.add_argument("--cprofile", type=int, metavar="N",
+                        help="Capture the first N cards of every rendering process with cProfile")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip cards the output folder's run journal records as up to date")
+    parser.add_argument("--no-journal", action="store_true",
+                        help="Don't record finished cards in the output folder's run journal")
+    parser.add_argument("--no-preflight", action="store_true",
+                        help="Skip the barcode check that runs over the whole data file before rendering")
+    parser.add_argument("--strict", action="store_true",
+                        help="Don't render anything if a barcode is invalid or shared by several cards")
+    parser.add_argument("--sheets", choices=SHEET_FORMATS,
+                        help="Impose the cards onto print sheets in one PDF or TIFF instead of writing PNGs")
+    parser.add_argument("--sheet-size", choices=list(SHEET_SIZES_MM),
+                        help="Print sheet size for --sheets (default from config.json)")
+    parser.add_argument("--vector", choices=VECTOR_FORMATS,
+                        help="Write vector cards over one shared background, as a multi-page PDF or one SVG per card")
+    return parser
+
+def load_layout(layout_path):
+    """Load a CardLayout from a JSON file, or the defaults when no file is given"""
+    settings = {"font_family": CONFIG['business'].get('default_font', "Arial")}
+    if layout_path:
+        with open(layout_path, 'r', encoding='utf-8') as f:
+            settings.update(json.load(f))
+    return CardLayout.from_dict(settings)
+
+def run_render(argv):
+    """Run a headless render batch and return the process exit code"""
+    args = build_parser().parse_args(argv)
+
+    try:
+        layout = load_layout(args.layout)
+    except (OSError, ValueError) as e:
+        print(f"❌ Invalid layout: {str(e)}", file=sys.stderr)
+        return 2
+
+    if not os.path.isfile(args.background):
+        print(f"❌ Background image not found: {args.background}", file=sys.stderr)
+        return 2
+    try:
+        # Decodes the background and resolves the font, as every rendering process will
+        compiled = compile_layout(layout, args.background)
+    except (OSError, ValueError) as e:
+        print(f"❌ Can't use this background and layout: {str(e)}", file=sys.stderr)
+        return 2
+
+    os.makedirs(args.out, exist_ok=True)
+
+    output_settings = OutputSettings.from_config(CONFIG)
+    if args.compress_level is not None:
+        output_settings = replace(output_settings, compress_level=args.compress_level)
+    if args.fast_png:
+        output_settings = replace(output_settings, fast=True)
+    if args.sink:
+        output_settings = replace(output_settings, sink=args.sink)
+    if args.shard_size:
+        output_settings = replace(output_settings, shard_size=args.shard_size)
+    if output_settings.sink not in OUTPUT_SINKS:
+        print(f"❌ Unknown output sink: {output_settings.sink} (choose from {', '.join(OUTPUT_SINKS)})", file=sys.stderr)
+        return 2
+
+    profile = ProfileSettings.from_config(CONFIG)
+    if args.profile:
+        profile = replace(profile, enabled=True)
+    if args.profile_format:
+        profile = replace(profile, trace_format=args.profile_format)
+    if args.cprofile is not None:
+        profile = replace(profile, cprofile_cards=args.cprofile)
+
+    checkpoint = CheckpointSettings.from_config(CONFIG)
+    if args.resume:
+        checkpoint = replace(checkpoint, resume=True)
+    if args.no_journal:
+        checkpoint = replace(checkpoint, journal=False, resume=False)
+
+    imposition = ImpositionSettings.from_config(CONFIG)
+    if args.sheets:
+        imposition = replace(imposition, enabled=True, format=args.sheets)
+    if args.sheet_size:
+        imposition = replace(imposition, sheet=args.sheet_size)
+    if imposition.enabled:
+        try:
+            sheet_geometry(imposition)
+        except ValueError as e:
+            print(f"❌ Invalid imposition settings: {str(e)}", file=sys.stderr)
+            return 2
+        fit_warning = describe_card_fit(imposition, args.background)
+        if fit_warning:
+            print(fit_warning)
+
+    vector = VectorSettings.from_config(CONFIG)
+    if args.vector:
+        vector = replace(vector, enabled=True, format=args.vector)
+    if vector.enabled:
+        try:
+            validate_vector(vector, compiled)
+        except (OSError, ValueError) as e:
+            print(f"❌ Invalid vector settings: {str(e)}", file=sys.stderr)
+            return 2
+        if imposition.enabled:
+            print("❌ Vector output can't be imposed onto print sheets; turn off one of them", file=sys.stderr)
+            return 2
+
+    unresumable = unresumable_output(checkpoint, output_settings, imposition, vector)
+    if unresumable:
+        print(f"❌ {unresumable}. Drop --resume (or checkpoint.resume in config.json) to render the batch again",
+              file=sys.stderr)
+        return 2
+
+    try:
+        total, rows = load_card_rows(args.data, args.barcode_col, args.member_col, args.pin_col)
+    except (OSError, ValueError) as e:
+        print(f"❌ {str(e)}", file=sys.stderr)
+        return 2
+
+    preflight = PreflightSettings.from_config(CONFIG)
+    if args.no_preflight:
+        preflight = replace(preflight, enabled=False)
+    if args.strict:
+        preflight = replace(preflight, strict=True)
+    if preflight.enabled:
+        report = preflight_data_file(args.data, args.barcode_col, preflight)
+        for line in describe_preflight(report, preflight.max_listed):
+            print(line)
+        if preflight.strict and report.has_errors:
+            print("❌ Barcode preflight failed; nothing was rendered", file=sys.stderr)
+            return 2
+
+    print(f"🔄 Generating {total if total is not None else 'all'} gift cards...")
+
+    batch_stats = {}
+    progress = BatchProgress(total)
+    report_every = max(1, total // 100) if total else 1000
+    for card_number, filename, error, skipped in render_batch(
+        rows,
+        layout,
+        args.background,
+        args.out,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        stats=batch_stats,
+        output_settings=output_settings,
+        profile=profile,
+        checkpoint=checkpoint,
+        imposition=imposition,
+        vector=vector
+    ):
+        progress.record(error, skipped)
+        if error:
+            print(f"❌ Error generating card {card_number}: {error}", file=sys.stderr)
+            continue
+
+        if (progress.succeeded + progress.skipped) % report_every == 0:
+            print(progress.describe())
+
+    summary = progress.snapshot()
+    print(
+        f"✅ Generated {summary['succeeded']}/{summary['done'] - summary['skipped']} gift cards successfully "
+        f"in {summary['elapsed']:.1f}s ({summary['rate']:.1f} cards/s)!"
+    )
+    if summary['skipped']:
+        print(f"⏭️ Skipped {summary['skipped']} cards that were already up to date")
+    if "barcode_cache" in batch_stats:
+        print(describe_cache_stats("Barcode cache", batch_stats["barcode_cache"]))
+    if "sheets" in batch_stats:
+        print(describe_sheets(batch_stats["sheets"], imposition))
+    elif "vector" in batch_stats:
+        print(describe_vector(batch_stats["vector"], vector))
+    else:
+        for line in describe_output(batch_stats, output_settings, args.out):
+            print(line)
+    for line in report_profile(batch_stats, args.out, profile):
+        print(line)
+    return 1 if summary['failed'] else 0
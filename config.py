@@ -0,0 +1,95 @@
+import os
+import sys
+import json
+
+# --- Configuration Loading ---
+def load_config():
+    """Load configuration from config.json"""
+    config_path = os.path.join(os.path.dirname(__file__), 'config.json')
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        # Default configuration if file doesn't exist
+        return {
+            "business": {
+                "name": "Gift Card Generator",
+                "default_font": "Arial",
+                "default_font_size": 12
+            },
+            "barcode": {
+                "format": "Code128",
+                "default_size": "Medium"
+            },
+            "ui": {
+                "window_width": 1200,
+                "window_height": 800,
+                "canvas_width": 400,
+                "canvas_height": 250
+            },
+            "rendering": {
+                "workers": 0,
+                "chunk_size": 64
+            },
+            "output": {
+                "writer_threads": 2,
+                "queue_size": 16,
+                "png_compress_level": 6,
+                "png_optimize": False,
+                "fast_png": False,
+                "png_strip_rows": 32,
+                "sink": "files",
+                "shard_size": 1000
+            },
+            "profiling": {
+                "enabled": False,
+                "trace_format": "json",
+                "cprofile_cards": 0
+            },
+            "checkpoint": {
+                "journal": True,
+                "resume": False,
+                "commit_every": 256
+            },
+            "preflight": {
+                "enabled": True,
+                "strict": False,
+                "max_listed": 10,
+                "outlier_iqr": 1.5
+            },
+            "imposition": {
+                "enabled": False,
+                "sheet": "A4",
+                "orientation": "auto",
+                "format": "pdf",
+                "dpi": 300,
+                "card_width_mm": 85.6,
+                "card_height_mm": 53.98,
+                "bleed_mm": 2,
+                "gutter_mm": 0,
+                "margin_mm": 10,
+                "columns": 0,
+                "rows": 0,
+                "crop_marks": True,
+                "compress_level": 6
+            },
+            "vector": {
+                "enabled": False,
+                "format": "pdf",
+                "dpi": 300,
+                "compress_level": 6
+            }
+        }
+
+# Load configuration
+CONFIG = load_config()
+
+def get_resource_path(relative_path):
+    """Get absolute path to resource, works for dev and for PyInstaller"""
+    try:
+        # PyInstaller creates a temp folder and stores path in _MEIPASS
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+    
+    return os.path.join(base_path, relative_path)
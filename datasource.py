@@ -0,0 +1,150 @@
+import pandas as pd
+
+# --- Card Data Loading ---
+# Rows are yielded as (card_number, barcode_data, member_number, verification_code)
+# tuples, the shape consumed by batch.render_batch. Files are streamed so
+# rendering starts after the first chunk and memory stays flat. Every value is
+# read as text, so numeric barcodes keep all their digits and empty cells
+# become "" rather than NaN.
+
+CSV_CHUNK_SIZE = 10000
+
+def count_csv_rows(data_path):
+    """Estimate the number of data rows in a CSV file by counting line breaks"""
+    count = 0
+    last_block = b""
+    with open(data_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            count += block.count(b"\n")
+            last_block = block
+    # Account for a final line without a trailing newline, minus the header
+    if last_block and not last_block.endswith(b"\n"):
+        count += 1
+    return max(0, count - 1)
+
+def _check_columns(available, barcode_col, member_col, verification_col):
+    """Raise ValueError naming every mapped column missing from the file"""
+    missing_cols = []
+    for col_name, col_entry in [(barcode_col, "Barcode"), (member_col, "Card Number"), (verification_col, "Verification Code")]:
+        if col_name not in available:
+            missing_cols.append(f"{col_entry} ({col_name})")
+
+    if missing_cols:
+        raise ValueError(f"Missing columns: {', '.join(missing_cols)}")
+
+def _cell_text(value):
+    """Convert a typed spreadsheet cell to the text pandas would read with dtype=str"""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def _iter_columns(df, columns):
+    """Walk the mapped columns of a DataFrame as plain tuples of strings"""
+    return zip(*(df[col].tolist() for col in columns))
+
+def _iter_csv_rows(data_path, columns, chunk_size):
+    """Stream the mapped columns of a CSV file chunk by chunk"""
+    for chunk in pd.read_csv(
+        data_path,
+        usecols=list(set(columns)),
+        dtype=str,
+        keep_default_na=False,
+        chunksize=chunk_size
+    ):
+        yield from _iter_columns(chunk, columns)
+
+def _iter_sheet_rows(workbook, sheet_rows, positions):
+    """Stream the mapped columns of an openpyxl read-only worksheet"""
+    try:
+        for values in sheet_rows:
+            # Read-only sheets can report trailing rows with no values at all
+            if all(value is None for value in values):
+                continue
+            yield tuple(_cell_text(values[p]) if p < len(values) else "" for p in positions)
+    finally:
+        workbook.close()
+
+def _open_sheet(data_path):
+    """Open the active sheet of an .xlsx file read-only, returning (workbook, worksheet, rows, header)"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(data_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.active
+        sheet_rows = worksheet.iter_rows(values_only=True)
+        header = [str(value) if value is not None else "" for value in next(sheet_rows, ())]
+    except Exception:
+        workbook.close()
+        raise
+    return workbook, worksheet, sheet_rows, header
+
+def _open_excel_rows(data_path, columns):
+    """Open an .xlsx file in read-only mode, returning (row_estimate, rows)"""
+    workbook, worksheet, sheet_rows, header = _open_sheet(data_path)
+    try:
+        _check_columns(header, *columns)
+        positions = [header.index(col) for col in columns]
+        total = worksheet.max_row - 1 if worksheet.max_row else None
+    except Exception:
+        workbook.close()
+        raise
+    return total, _iter_sheet_rows(workbook, sheet_rows, positions)
+
+def load_card_rows(data_path, barcode_col, member_col, verification_col, chunk_size=CSV_CHUNK_SIZE):
+    """Open a data file as a lazy stream of card rows, returning (row_estimate, rows).
+
+    Only the three mapped columns are read, as strings. CSV files are parsed
+    in chunks and .xlsx files through openpyxl's read-only iterator; legacy
+    .xls files are still loaded whole by pandas. row_estimate is meant for
+    progress display and may be None when the file does not record its size.
+
+    Raises ValueError naming every mapped column missing from the file.
+    """
+    columns = [barcode_col, member_col, verification_col]
+
+    if data_path.endswith('.csv'):
+        header = pd.read_csv(data_path, nrows=0).columns
+        _check_columns(header, *columns)
+        total, values = count_csv_rows(data_path), _iter_csv_rows(data_path, columns, chunk_size)
+    elif data_path.endswith('.xls'):
+        df = pd.read_excel(data_path, dtype=str, keep_default_na=False)
+        _check_columns(df.columns, *columns)
+        total, values = len(df), _iter_columns(df, columns)
+    else:
+        total, values = _open_excel_rows(data_path, columns)
+
+    # Sequential card numbers follow the row position in the file
+    rows = (
+        (index + 1, barcode_data, member_number, verification_code)
+        for index, (barcode_data, member_number, verification_code) in enumerate(values)
+    )
+    return total, rows
+
+def load_column(data_path, column):
+    """Read one column of a data file whole, as a Series of strings indexed by card number.
+
+    Uses the same text conversion and row numbering as load_card_rows, for
+    checks that need to see every value at once. Raises ValueError if the
+    column is missing.
+    """
+    if data_path.endswith('.csv'):
+        header = pd.read_csv(data_path, nrows=0).columns
+        if column not in header:
+            raise ValueError(f"Missing column: {column}")
+        values = pd.read_csv(data_path, usecols=[column], dtype=str, keep_default_na=False)[column]
+    elif data_path.endswith('.xls'):
+        df = pd.read_excel(data_path, dtype=str, keep_default_na=False)
+        if column not in df.columns:
+            raise ValueError(f"Missing column: {column}")
+        values = df[column]
+    else:
+        workbook, _, sheet_rows, header = _open_sheet(data_path)
+        if column not in header:
+            workbook.close()
+            raise ValueError(f"Missing column: {column}")
+        cells = _iter_sheet_rows(workbook, sheet_rows, [header.index(column)])
+        values = pd.Series([value for value, in cells], dtype=object)
+
+    return pd.Series(values.to_numpy(), index=pd.RangeIndex(1, len(values) + 1), name=column)
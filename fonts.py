@@ -0,0 +1,110 @@
+from PIL import ImageFont
+from functools import lru_cache
+import os
+import shutil
+import subprocess
+import sys
+
+# --- Font Resolution ---
+# Font families are resolved to a file once per process, and FreeTypeFont
+# objects are cached per (family, size) so batches and the preview share them.
+
+FONT_EXTENSIONS = ('.ttf', '.otf', '.ttc')
+
+# Metric-compatible or widely installed stand-ins, tried when a family is missing
+FALLBACK_FAMILIES = ("Arial", "Liberation Sans", "Arimo", "DejaVu Sans", "Helvetica")
+
+def font_directories():
+    """System and user font directories for the current platform"""
+    home = os.path.expanduser("~")
+    if sys.platform.startswith("win"):
+        windir = os.environ.get("WINDIR", r"C:\Windows")
+        local = os.environ.get("LOCALAPPDATA", os.path.join(home, "AppData", "Local"))
+        return [os.path.join(windir, "Fonts"), os.path.join(local, "Microsoft", "Windows", "Fonts")]
+    if sys.platform == "darwin":
+        return ["/System/Library/Fonts", "/Library/Fonts", os.path.join(home, "Library", "Fonts")]
+    return [
+        "/usr/share/fonts",
+        "/usr/local/share/fonts",
+        os.path.join(home, ".fonts"),
+        os.path.join(home, ".local", "share", "fonts")
+    ]
+
+def _normalize(name):
+    """Lower-case a family or file name and drop separators for matching"""
+    return "".join(ch for ch in name.lower() if ch.isalnum())
+
+@lru_cache(maxsize=1)
+def _font_index():
+    """Map normalized font file stems to paths across all font directories"""
+    index = {}
+    for directory in font_directories():
+        for root, _, files in os.walk(directory):
+            for name in files:
+                stem, ext = os.path.splitext(name)
+                if ext.lower() in FONT_EXTENSIONS:
+                    index.setdefault(_normalize(stem), os.path.join(root, name))
+    return index
+
+def _fc_match(family):
+    """Ask fontconfig for the file of an exactly matching family, if fc-match exists"""
+    if not shutil.which("fc-match"):
+        return None
+    try:
+        result = subprocess.run(
+            ["fc-match", "--format=%{family}\n%{file}", family],
+            capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    lines = result.stdout.splitlines()
+    if result.returncode != 0 or len(lines) < 2:
+        return None
+    # fc-match always answers with something; only accept the family we asked for
+    matched_families = [_normalize(name) for name in lines[0].split(",")]
+    if _normalize(family) not in matched_families:
+        return None
+    return lines[1]
+
+def _search_family(family):
+    """Find a regular-weight file for a family by file name in the font directories"""
+    index = _font_index()
+    key = _normalize(family)
+    for candidate in (key, key + "regular", key + "mt", key + "book"):
+        if candidate in index:
+            return index[candidate]
+    return None
+
+@lru_cache(maxsize=None)
+def resolve_font_file(family):
+    """Resolve a font family (or a font file path) to a file, or None if nothing matches"""
+    if family and os.path.isfile(family):
+        return family
+
+    for name in (family,) + FALLBACK_FAMILIES:
+        if not name:
+            continue
+        path = _fc_match(name) or _search_family(name)
+        if path:
+            return path
+    return None
+
+@lru_cache(maxsize=64)
+def get_font(family, size):
+    """Return a shared font for family at size, falling back to Pillow's default font.
+
+    Fonts use Pillow's basic layout even when libraqm is installed: card text
+    is plain Latin, and the glyph cache in glyphs.py reproduces that layout
+    exactly.
+    """
+    path = resolve_font_file(family)
+    if path:
+        try:
+            return ImageFont.truetype(path, size, layout_engine=ImageFont.Layout.BASIC)
+        except OSError:
+            pass
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        # Pillow < 10.1 only has the fixed-size bitmap font
+        return ImageFont.load_default()
@@ -0,0 +1,199 @@
+from PIL import Image, ImageDraw, ImageFont
+from dataclasses import dataclass
+import threading
+
+# --- Glyph Run Cache ---
+# Card text is the same three labels with different values, drawn thousands
+# of times in the same font. Instead of having FreeType lay out and rasterize
+# every line from scratch, each process keeps the label prefixes as finished
+# masks and every character as a glyph mask with its metrics, and assembles
+# lines from those. The assembly follows Pillow's basic text layout (pen
+# positions from the font's advances and kerning, rounded to whole pixels,
+# glyph coverage blended in order) so the result matches ImageDraw.text pixel
+# for pixel. Fonts laid out any other way (libraqm shaping, bitmap fonts) get
+# whole lines rasterized by ImageDraw.text instead, which is slower but exact.
+
+@dataclass(frozen=True)
+class Glyph:
+    """A rasterized character: its box relative to the pen position and its coverage mask.
+
+    The box is font.getbbox of the character, which also spans the advance
+    of blank characters such as spaces; those have no mask.
+    """
+    box: tuple
+    mask: object
+
+@dataclass(frozen=True)
+class GlyphRun:
+    """A rasterized piece of a line.
+
+    bbox is relative to the line's text origin (None for empty text) and mask
+    covers exactly that box (None when nothing is inked). advance is the pen
+    position after the last character, for continuing the line.
+    """
+    text: str
+    mask: object
+    bbox: tuple
+    advance: float
+
+@dataclass(frozen=True)
+class TextRun:
+    """A line ready to draw: its measured box and (offset, mask) pieces.
+
+    bbox matches font.getbbox of the whole line. static pieces are the same
+    on every card (the label) and variable pieces hold the value. When label
+    and value ink could touch, the whole line is one variable piece so the
+    blending stays exact.
+    """
+    text: str
+    bbox: tuple
+    static: tuple
+    variable: tuple
+
+def _pen_pixel(pen):
+    """Whole-pixel glyph position for a fractional pen position, as FreeType rounds it"""
+    return int(pen + 0.5)
+
+def _pieces(run):
+    """(offset, mask) drawing pieces of a run"""
+    return ((run.bbox[:2], run.mask),) if run.mask is not None else ()
+
+class GlyphCache:
+    """Glyph masks, advances and finished label runs for one font.
+
+    Thread-safe: the PNG writer threads never touch it, but the GUI preview
+    renders on its own thread.
+    """
+
+    def __init__(self, font):
+        self.font = font
+        # Whether lines can be assembled from cached glyphs; see the section comment
+        self.assembles = getattr(font, "layout_engine", None) == ImageFont.Layout.BASIC
+        self._glyphs = {}
+        self._advances = {}  # (previous, character) -> pen advance including kerning
+        self._labels = {}    # label -> (GlyphRun, right edge of its ink)
+        self._lock = threading.Lock()
+
+    def glyph(self, char):
+        """Cached mask of one character"""
+        glyph = self._glyphs.get(char)
+        if glyph is None:
+            left, top, right, bottom = self.font.getbbox(char)
+            mask = None
+            if right > left and bottom > top:
+                mask = Image.new("L", (right - left, bottom - top))
+                ImageDraw.Draw(mask).text((-left, -top), char, fill=255, font=self.font)
+            glyph = Glyph(box=(left, top, right, bottom), mask=mask)
+            with self._lock:
+                self._glyphs[char] = glyph
+        return glyph
+
+    def advance(self, previous, char):
+        """Pen advance for char when it follows previous (None at the start of a line)"""
+        key = (previous, char)
+        advance = self._advances.get(key)
+        if advance is None:
+            if previous is None:
+                advance = self.font.getlength(char)
+            else:
+                # getlength includes the pair's kerning, in exact 1/64 pixel steps
+                advance = self.font.getlength(previous + char) - self.font.getlength(previous)
+            with self._lock:
+                self._advances[key] = advance
+        return advance
+
+    def _assemble(self, text, pen=0.0, previous=None):
+        """Lay out and rasterize text from a pen position, after the character previous"""
+        placed = []
+        for char in text:
+            placed.append((_pen_pixel(pen), self.glyph(char)))
+            pen += self.advance(previous, char)
+            previous = char
+        if not placed:
+            return GlyphRun(text=text, mask=None, bbox=None, advance=pen)
+
+        left = min(x + glyph.box[0] for x, glyph in placed)
+        top = min(glyph.box[1] for _, glyph in placed)
+        right = max(x + glyph.box[2] for x, glyph in placed)
+        bottom = max(glyph.box[3] for _, glyph in placed)
+        mask = None
+        if right > left and bottom > top and any(glyph.mask is not None for _, glyph in placed):
+            mask = Image.new("L", (right - left, bottom - top))
+            for x, glyph in placed:
+                if glyph.mask is not None:
+                    # Coverage blends over what is already there, like FreeType's line bitmap
+                    mask.paste(255, (x + glyph.box[0] - left, glyph.box[1] - top), glyph.mask)
+        return GlyphRun(text=text, mask=mask, bbox=(left, top, right, bottom), advance=pen)
+
+    def line(self, text):
+        """Rasterize a whole line; like getbbox, its box always includes the text origin"""
+        run = self._assemble(text)
+        if run.bbox is None:
+            return GlyphRun(text=text, mask=None, bbox=(0, 0, 0, 0), advance=0.0)
+        if run.bbox[0] <= 0:
+            return run
+        # A line starting with blank space: widen the box (and mask) back to the origin
+        left, top, right, bottom = run.bbox
+        mask = None
+        if run.mask is not None:
+            mask = Image.new("L", (right, bottom - top))
+            mask.paste(run.mask, (left, 0))
+        return GlyphRun(text=text, mask=mask, bbox=(0, top, right, bottom), advance=run.advance)
+
+    def drawn_line(self, text):
+        """Rasterize a whole line with ImageDraw.text, for fonts glyphs can't be assembled for"""
+        left, top, right, bottom = self.font.getbbox(text)
+        mask = None
+        if right > left and bottom > top:
+            mask = Image.new("L", (right - left, bottom - top))
+            ImageDraw.Draw(mask).text((-left, -top), text, fill=255, font=self.font)
+        return GlyphRun(text=text, mask=mask, bbox=(left, top, right, bottom), advance=self.font.getlength(text))
+
+    def label(self, text):
+        """Cached run of a fixed label such as "Card Number: " and the right edge of its ink"""
+        cached = self._labels.get(text)
+        if cached is None:
+            run = self.line(text)
+            ink = run.mask.getbbox() if run.mask is not None else None
+            cached = (run, run.bbox[0] + ink[2] if ink else None)
+            with self._lock:
+                self._labels[text] = cached
+        return cached
+
+    def labelled(self, label, value):
+        """TextRun for label + value, reusing the cached label"""
+        text = label + value
+        if not self.assembles:
+            run = self.drawn_line(text)
+            return TextRun(text=text, bbox=run.bbox, static=(), variable=_pieces(run))
+        if not label:
+            run = self.line(text)
+            return TextRun(text=text, bbox=run.bbox, static=(), variable=_pieces(run))
+
+        label_run, ink_right = self.label(label)
+        value_run = self._assemble(value, label_run.advance, label[-1])
+        if value_run.bbox is None:
+            return TextRun(text=text, bbox=label_run.bbox, static=_pieces(label_run), variable=())
+
+        bbox = (
+            min(label_run.bbox[0], value_run.bbox[0]),
+            min(label_run.bbox[1], value_run.bbox[1]),
+            max(label_run.bbox[2], value_run.bbox[2]),
+            max(label_run.bbox[3], value_run.bbox[3])
+        )
+        # Glyph boxes contain their ink, so this proves no pixel gets coverage from both
+        if value_run.mask is None or ink_right is None or ink_right <= value_run.bbox[0]:
+            return TextRun(text=text, bbox=bbox, static=_pieces(label_run), variable=_pieces(value_run))
+        run = self.line(text)
+        return TextRun(text=text, bbox=run.bbox, static=(), variable=_pieces(run))
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def glyph_cache(font):
+    """Per-process GlyphCache for a font object"""
+    cache = _caches.get(id(font))
+    if cache is None or cache.font is not font:
+        with _caches_lock:
+            cache = _caches[id(font)] = GlyphCache(font)
+    return cache
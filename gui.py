@@ -0,0 +1,1120 @@
+import customtkinter as ctk
+import tkinter as tk
+from tkinter import filedialog, messagebox, colorchooser
+from PIL import ImageTk
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+import uuid
+import base64
+from datetime import datetime
+
+from config import CONFIG
+from renderer import (
+    BARCODE_SIZES, TEXT_PADDING, CardLayout, compile_layout, load_background_proxy,
+    preview_layer_keys, preview_barcode_sprite, preview_text_sprite
+)
+from datasource import load_card_rows
+from batch import BatchProgress, describe_cache_stats, render_batch, unresumable_output
+from imposition import ImpositionSettings, describe_card_fit, describe_sheets, sheet_geometry
+from vector import VectorSettings, describe_vector, validate_vector
+from manifest import CheckpointSettings
+from output import OutputSettings, describe_output
+from preflight import PreflightSettings, describe_preflight, preflight_data_file
+from profiling import ProfileSettings, report_profile
+
+# --- Preview Settings ---
+PREVIEW_DEBOUNCE_MS = 150  # Quiet period before a burst of edits is rendered
+PREVIEW_POLL_MS = 30       # How often the Tk thread checks for a finished frame
+PREVIEW_SAMPLE = ("1234567890123", "12345", "ABCD1234", 1)  # barcode, card number, PIN, card
+PREVIEW_LAYERS = ("background", "barcode", "text")  # Canvas stacking order, bottom first
+
+# --- UI Event Settings ---
+UI_FRAME_MS = 100         # How often the Tk thread drains worker events and redraws progress
+UI_EVENTS_PER_FRAME = 500  # Cap on events handled per frame so a flood can't stall the UI
+LOG_MAX_LINES = 2000      # Oldest log lines are dropped beyond this
+
+# --- Output Sink Labels ---
+SINK_LABELS = {
+    "files": "Separate PNG files",
+    "sharded": "PNGs in numbered subfolders",
+    "zip": "One ZIP archive",
+    "tar": "One TAR archive"
+}
+
+# --- Theme Setup ---
+ctk.set_appearance_mode("Dark")
+ctk.set_default_color_theme("dark-blue")
+
+def show_toast(widget, message, duration=3000, color="#00FF00"):
+    """Show a temporary toast message"""
+    toast = ctk.CTkLabel(widget, text=message, text_color=color, font=("Arial", 12, "bold"))
+    toast.pack(pady=5)
+    widget.after(duration, toast.destroy)
+
+def safe_get_input(entry, default="", strip=True, convert_type=None):
+    """Safely get input from entry widget with optional type conversion"""
+    try:
+        value = entry.get()
+        if strip:
+            value = value.strip()
+        if not value:
+            return default
+        if convert_type:
+            return convert_type(value)
+        return value
+    except Exception:
+        return default
+
+class GiftCardGenerator(ctk.CTk):
+    def __init__(self):
+        super().__init__()
+        self.title(f"Gift Card Generator - {CONFIG['business']['name']}")
+        self.geometry(f"{CONFIG['ui']['window_width']}x{CONFIG['ui']['window_height']}")
+        self.configure(fg_color="#121212")
+        
+        # Initialize canvas dimensions first
+        self.canvas_width = CONFIG['ui']['canvas_width']
+        self.canvas_height = CONFIG['ui']['canvas_height']
+        
+        # Initialize variables
+        self.background_path = None
+        self.data_path = None
+        self.output_path = None
+        
+        # Positioning variables
+        self.barcode_position_var = tk.StringVar(value="Bottom-Right")
+        self.barcode_x = tk.StringVar(value="85")
+        self.barcode_y = tk.StringVar(value="85")
+        self.barcode_size_var = tk.StringVar(value="Medium")
+        
+        self.text_position_var = tk.StringVar(value="Bottom-Left")
+        self.text_x = tk.StringVar(value="10")
+        self.text_y = tk.StringVar(value="90")
+        self.text_background_var = tk.StringVar(value="White Box")
+        self.text_alignment_var = tk.StringVar(value="Left")
+        self.text_scale = tk.DoubleVar(value=100.0)
+        
+        # Preview canvas variables
+        self.preview_canvas = None
+        self.preview_image = None
+        self.canvas_scale = 1.0
+        self.dragging_item = None
+        self.drag_data = {"x": 0, "y": 0}
+        
+        # Canvas item IDs, PhotoImages and content keys per preview layer
+        self.preview_items = {}
+        self.preview_photos = {}
+        self.preview_layer_keys = {}
+        self.preview_geometry = None
+        
+        # Preview variables
+        self.preview_update_timer = None
+        self.preview_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preview")
+        self.preview_future = None
+        self.preview_generation = 0
+        self.preview_polling = False
+        
+        # Custom color variable
+        self.custom_bg_color = "#E0E0E0"
+        
+        # Worker threads never touch widgets: they post (kind, payload) events
+        # here and the Tk thread applies them once per frame
+        self.ui_events = queue.Queue()
+        self.batch_progress = None
+        self.generating = False
+        
+        self.setup_ui()
+        self.after(UI_FRAME_MS, self.process_ui_events)
+    
+    def setup_ui(self):
+        """Setup the user interface"""
+        # Create scrollable frame for all content
+        self.scrollable_frame = ctk.CTkScrollableFrame(
+            self, 
+            fg_color="#121212",
+            scrollbar_button_color="#333333",
+            scrollbar_button_hover_color="#444444"
+        )
+        self.scrollable_frame.pack(fill="both", expand=True)
+        
+        # Title
+        ctk.CTkLabel(self.scrollable_frame, text="Gift Card Generator", font=("Segoe UI", 18, "bold")).pack(pady=(20, 15), padx=20, fill="x")
+        
+        self.setup_file_selection()
+        self.setup_column_configuration()
+        self.setup_layout_designer()
+        self.setup_output_settings()
+        self.setup_generation_controls()
+        self.setup_log_section()
+        
+        # Initialize event bindings
+        self.setup_event_bindings()
+    
+    def setup_file_selection(self):
+        """Setup file selection section"""
+        file_frame = ctk.CTkFrame(self.scrollable_frame, fg_color="#1E1E1E", corner_radius=12)
+        file_frame.pack(pady=(10, 5), padx=20, fill="x")
+        
+        ctk.CTkLabel(file_frame, text="📁 File Selection", font=("Segoe UI", 14, "bold")).pack(pady=(8, 5), padx=20, fill="x")
+        
+        # Background image selection
+        bg_frame = ctk.CTkFrame(file_frame, fg_color="transparent")
+        bg_frame.pack(pady=(3, 3), padx=20, fill="x")
+        ctk.CTkLabel(bg_frame, text="Background Image:", width=120, anchor="w").pack(side="left", padx=(0, 10))
+        self.bg_path_var = tk.StringVar(value="No file selected")
+        self.bg_path_label = ctk.CTkLabel(bg_frame, textvariable=self.bg_path_var, anchor="w")
+        self.bg_path_label.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        ctk.CTkButton(bg_frame, text="Browse", command=self.select_background, width=80).pack(side="right")
+        
+        # Data file selection
+        data_frame = ctk.CTkFrame(file_frame, fg_color="transparent")
+        data_frame.pack(pady=(3, 8), padx=20, fill="x")
+        ctk.CTkLabel(data_frame, text="Data File (CSV/Excel):", width=120, anchor="w").pack(side="left", padx=(0, 10))
+        self.data_path_var = tk.StringVar(value="No file selected")
+        self.data_path_label = ctk.CTkLabel(data_frame, textvariable=self.data_path_var, anchor="w")
+        self.data_path_label.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        ctk.CTkButton(data_frame, text="Browse", command=self.select_data_file, width=80).pack(side="right")
+    
+    def setup_column_configuration(self):
+        """Setup column configuration section"""
+        config_frame = ctk.CTkFrame(self.scrollable_frame, fg_color="#1E1E1E", corner_radius=12)
+        config_frame.pack(pady=(5, 5), padx=20, fill="x")
+        
+        ctk.CTkLabel(config_frame, text="⚙️ Column Configuration", font=("Segoe UI", 14, "bold")).pack(pady=(8, 5), padx=20, fill="x")
+        
+        # Column name inputs
+        col_grid = ctk.CTkFrame(config_frame, fg_color="transparent")
+        col_grid.pack(pady=(3, 8), padx=20, fill="x")
+        
+        # Barcode column
+        ctk.CTkLabel(col_grid, text="Barcode Column:", width=120, anchor="w").grid(row=0, column=0, padx=(0, 10), pady=2, sticky="w")
+        self.barcode_col = ctk.CTkEntry(col_grid, placeholder_text="e.g., barcode")
+        self.barcode_col.grid(row=0, column=1, padx=(0, 20), pady=2, sticky="ew")
+        
+        # Card number column
+        ctk.CTkLabel(col_grid, text="Card Number:", width=120, anchor="w").grid(row=1, column=0, padx=(0, 10), pady=2, sticky="w")
+        self.member_col = ctk.CTkEntry(col_grid, placeholder_text="e.g., card_number")
+        self.member_col.grid(row=1, column=1, padx=(0, 20), pady=2, sticky="ew")
+        
+        # Verification code column
+        ctk.CTkLabel(col_grid, text="Verification Code:", width=120, anchor="w").grid(row=2, column=0, padx=(0, 10), pady=2, sticky="w")
+        self.verification_col = ctk.CTkEntry(col_grid, placeholder_text="e.g., pin")
+        self.verification_col.grid(row=2, column=1, padx=(0, 20), pady=2, sticky="ew")
+        
+        col_grid.grid_columnconfigure(1, weight=1)
+        
+        # Add event listeners for column configuration changes
+        self.barcode_col.bind("<KeyRelease>", self.on_column_config_change)
+        self.member_col.bind("<KeyRelease>", self.on_column_config_change)
+        self.verification_col.bind("<KeyRelease>", self.on_column_config_change)
+    
+    def setup_layout_designer(self):
+        """Setup layout designer section"""
+        layout_frame = ctk.CTkFrame(self.scrollable_frame, fg_color="#1E1E1E", corner_radius=12)
+        layout_frame.pack(pady=(5, 5), padx=20, fill="x")
+        
+        ctk.CTkLabel(layout_frame, text="🎨 Layout Designer", font=("Segoe UI", 14, "bold")).pack(pady=(8, 5), padx=20, fill="x")
+        
+        # Preview and controls container
+        layout_container = ctk.CTkFrame(layout_frame, fg_color="transparent")
+        layout_container.pack(pady=(3, 8), padx=20, fill="x")
+        
+        # Left side - Preview Canvas
+        preview_frame = ctk.CTkFrame(layout_container, fg_color="#2B2B2B", corner_radius=8)
+        preview_frame.pack(side="left", padx=(0, 10), fill="y")
+        
+        canvas_label = ctk.CTkLabel(preview_frame, text="🎴 Gift Card Preview", font=("Segoe UI", 12, "bold"))
+        canvas_label.pack(pady=(5, 3))
+        
+        # Create live preview canvas
+        self.preview_canvas = tk.Canvas(
+            preview_frame, 
+            width=self.canvas_width, 
+            height=self.canvas_height, 
+            bg="#2B2B2B", 
+            highlightthickness=0
+        )
+        self.preview_canvas.pack(pady=(0, 5), padx=5)
+        
+        # Bind canvas events for drag and drop
+        self.preview_canvas.bind("<Button-1>", self.on_canvas_click)
+        self.preview_canvas.bind("<B1-Motion>", self.on_canvas_drag)
+        self.preview_canvas.bind("<ButtonRelease-1>", self.on_canvas_release)
+        
+        # Right side - Position Controls
+        controls_frame = ctk.CTkFrame(layout_container, fg_color="transparent")
+        controls_frame.pack(side="right", fill="both", expand=True)
+        
+        self.setup_barcode_positioning(controls_frame)
+        self.setup_text_positioning(controls_frame)
+        
+        # Reset button
+        reset_btn = ctk.CTkButton(
+            controls_frame,
+            text="Reset to Default",
+            command=self.reset_positions,
+            height=25,
+            fg_color="#555555"
+        )
+        reset_btn.pack(pady=(5, 0))
+    
+    def setup_barcode_positioning(self, parent):
+        """Setup barcode positioning controls"""
+        barcode_frame = ctk.CTkFrame(parent, fg_color="#333333", corner_radius=8)
+        barcode_frame.pack(fill="x", pady=(0, 5))
+        
+        ctk.CTkLabel(barcode_frame, text="📊 Barcode Positioning", font=("Segoe UI", 12, "bold")).pack(pady=(5, 3), padx=10)
+        
+        # Barcode position dropdown
+        pos_frame1 = ctk.CTkFrame(barcode_frame, fg_color="transparent")
+        pos_frame1.pack(fill="x", padx=10, pady=2)
+        
+        ctk.CTkLabel(pos_frame1, text="Position:", width=80, anchor="w").pack(side="left")
+        barcode_pos_combo = ctk.CTkComboBox(
+            pos_frame1, 
+            variable=self.barcode_position_var,
+            values=["Top-Left", "Top-Right", "Bottom-Left", "Bottom-Right", "Center", "Custom"],
+            command=self.on_barcode_position_change,
+            width=120
+        )
+        barcode_pos_combo.pack(side="left", padx=(5, 0))
+        
+        # Custom coordinates (initially hidden)
+        self.barcode_custom_frame = ctk.CTkFrame(barcode_frame, fg_color="transparent")
+        
+        coord_frame1 = ctk.CTkFrame(self.barcode_custom_frame, fg_color="transparent")
+        coord_frame1.pack(fill="x", pady=1)
+        ctk.CTkLabel(coord_frame1, text="X (%):", width=40, anchor="w").pack(side="left")
+        x_entry1 = ctk.CTkEntry(coord_frame1, textvariable=self.barcode_x, width=60)
+        x_entry1.pack(side="left", padx=(5, 10))
+        x_entry1.bind("<KeyRelease>", self.on_position_change)
+        
+        ctk.CTkLabel(coord_frame1, text="Y (%):", width=40, anchor="w").pack(side="left")
+        y_entry1 = ctk.CTkEntry(coord_frame1, textvariable=self.barcode_y, width=60)
+        y_entry1.pack(side="left", padx=(5, 0))
+        y_entry1.bind("<KeyRelease>", self.on_position_change)
+        
+        # Barcode size
+        size_frame1 = ctk.CTkFrame(barcode_frame, fg_color="transparent")
+        size_frame1.pack(fill="x", padx=10, pady=2)
+        
+        ctk.CTkLabel(size_frame1, text="Size:", width=80, anchor="w").pack(side="left")
+        size_combo1 = ctk.CTkComboBox(
+            size_frame1,
+            variable=self.barcode_size_var,
+            values=["Small", "Medium", "Large", "XL"],
+            command=self.on_position_change,
+            width=120
+        )
+        size_combo1.pack(side="left", padx=(5, 0))
+    
+    def setup_text_positioning(self, parent):
+        """Setup text positioning controls"""
+        text_frame = ctk.CTkFrame(parent, fg_color="#333333", corner_radius=8)
+        text_frame.pack(fill="x", pady=5)
+        
+        ctk.CTkLabel(text_frame, text="📝 Text Block Positioning", font=("Segoe UI", 12, "bold")).pack(pady=(5, 3), padx=10)
+        
+        # Text position dropdown
+        pos_frame2 = ctk.CTkFrame(text_frame, fg_color="transparent")
+        pos_frame2.pack(fill="x", padx=10, pady=2)
+        
+        ctk.CTkLabel(pos_frame2, text="Position:", width=80, anchor="w").pack(side="left")
+        text_pos_combo = ctk.CTkComboBox(
+            pos_frame2,
+            variable=self.text_position_var,
+            values=["Top-Left", "Top-Right", "Bottom-Left", "Bottom-Right", "Center", "Custom"],
+            command=self.on_text_position_change,
+            width=120
+        )
+        text_pos_combo.pack(side="left", padx=(5, 0))
+        
+        # Custom coordinates for text
+        self.text_custom_frame = ctk.CTkFrame(text_frame, fg_color="transparent")
+        
+        coord_frame2 = ctk.CTkFrame(self.text_custom_frame, fg_color="transparent")
+        coord_frame2.pack(fill="x", pady=1)
+        ctk.CTkLabel(coord_frame2, text="X (%):", width=40, anchor="w").pack(side="left")
+        x_entry2 = ctk.CTkEntry(coord_frame2, textvariable=self.text_x, width=60)
+        x_entry2.pack(side="left", padx=(5, 10))
+        x_entry2.bind("<KeyRelease>", self.on_position_change)
+        
+        ctk.CTkLabel(coord_frame2, text="Y (%):", width=40, anchor="w").pack(side="left")
+        y_entry2 = ctk.CTkEntry(coord_frame2, textvariable=self.text_y, width=60)
+        y_entry2.pack(side="left", padx=(5, 0))
+        y_entry2.bind("<KeyRelease>", self.on_position_change)
+        
+        # Text background style
+        bg_frame = ctk.CTkFrame(text_frame, fg_color="transparent")
+        bg_frame.pack(fill="x", padx=10, pady=2)
+        
+        ctk.CTkLabel(bg_frame, text="Background:", width=80, anchor="w").pack(side="left")
+        bg_combo = ctk.CTkComboBox(
+            bg_frame,
+            variable=self.text_background_var,
+            values=["None", "White Box", "Custom Color"],
+            command=self.on_background_change,
+            width=120
+        )
+        bg_combo.pack(side="left", padx=(5, 0))
+        
+        
+        # Custom color selection (initially hidden)
+        self.custom_color_frame = ctk.CTkFrame(text_frame, fg_color="transparent")
+        
+        color_frame = ctk.CTkFrame(self.custom_color_frame, fg_color="transparent")
+        color_frame.pack(fill="x", pady=1)
+        ctk.CTkLabel(color_frame, text="Color:", width=80, anchor="w").pack(side="left")
+        
+        # Color entry field
+        self.custom_color_entry = ctk.CTkEntry(color_frame, placeholder_text="#E0E0E0", width=100)
+        self.custom_color_entry.pack(side="left", padx=(5, 5))
+        self.custom_color_entry.bind("<KeyRelease>", self.on_custom_color_change)
+        
+        # Color preview button
+        self.color_preview_btn = ctk.CTkButton(
+            color_frame, text="", width=30, height=24, 
+            fg_color="#E0E0E0", hover_color="#D0D0D0",
+            command=self.open_color_picker
+        )
+        self.color_preview_btn.pack(side="left", padx=(0, 5))
+        
+        # Set initial custom color
+        self.custom_color_entry.insert(0, self.custom_bg_color)
+        
+        # Text alignment
+        align_frame = ctk.CTkFrame(text_frame, fg_color="transparent")
+        align_frame.pack(fill="x", padx=10, pady=(2, 5))
+        
+        ctk.CTkLabel(align_frame, text="Alignment:", width=80, anchor="w").pack(side="left")
+        align_combo = ctk.CTkComboBox(
+            align_frame,
+            variable=self.text_alignment_var,
+            values=["Left", "Center", "Right"],
+            command=self.on_position_change,
+            width=120
+        )
+        align_combo.pack(side="left", padx=(5, 0))
+        
+        # Text scale
+        text_scale_frame = ctk.CTkFrame(text_frame, fg_color="transparent")
+        text_scale_frame.pack(fill="x", padx=10, pady=2)
+        
+        ctk.CTkLabel(text_scale_frame, text="Text Scale (%):", width=80, anchor="w").pack(side="left")
+        text_scale_entry = ctk.CTkEntry(text_scale_frame, textvariable=self.text_scale, width=60)
+        text_scale_entry.pack(side="left", padx=(5, 5))
+        text_scale_entry.bind("<KeyRelease>", self.on_position_change)
+        
+        text_scale_slider = ctk.CTkSlider(
+            text_scale_frame,
+            from_=25, to=300,
+            variable=self.text_scale,
+            command=self.on_text_scale_change,
+            width=100
+        )
+        text_scale_slider.pack(side="left", padx=(5, 0))
+    
+    def setup_output_settings(self):
+        """Setup output settings section"""
+        output_frame = ctk.CTkFrame(self.scrollable_frame, fg_color="#1E1E1E", corner_radius=12)
+        output_frame.pack(pady=(5, 5), padx=20, fill="x")
+        
+        ctk.CTkLabel(output_frame, text="💾 Output Settings", font=("Segoe UI", 14, "bold")).pack(pady=(8, 5), padx=20, fill="x")
+        
+        # Output folder selection
+        out_frame = ctk.CTkFrame(output_frame, fg_color="transparent")
+        out_frame.pack(pady=(3, 8), padx=20, fill="x")
+        ctk.CTkLabel(out_frame, text="Output Folder:", width=120, anchor="w").pack(side="left", padx=(0, 10))
+        self.output_path_var = tk.StringVar(value="No folder selected")
+        self.output_path_label = ctk.CTkLabel(out_frame, textvariable=self.output_path_var, anchor="w")
+        self.output_path_label.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        ctk.CTkButton(out_frame, text="Browse", command=self.select_output_folder, width=80).pack(side="right")
+        
+        # Where the PNGs go
+        sink_frame = ctk.CTkFrame(output_frame, fg_color="transparent")
+        sink_frame.pack(pady=(0, 8), padx=20, fill="x")
+        ctk.CTkLabel(sink_frame, text="Write Cards As:", width=120, anchor="w").pack(side="left", padx=(0, 10))
+        sink = CONFIG.get('output', {}).get('sink', "files")
+        self.sink_var = tk.StringVar(value=SINK_LABELS.get(sink, SINK_LABELS["files"]))
+        ctk.CTkComboBox(
+            sink_frame,
+            variable=self.sink_var,
+            values=list(SINK_LABELS.values()),
+            width=200
+        ).pack(side="left")
+        
+        # PNG compression speed
+        self.fast_png_var = tk.BooleanVar(value=CONFIG.get('output', {}).get('fast_png', False))
+        ctk.CTkCheckBox(
+            output_frame,
+            text="Fast PNG compression (larger files)",
+            variable=self.fast_png_var
+        ).pack(pady=(0, 8), padx=20, anchor="w")
+        
+        # Resume from the output folder's run journal
+        self.resume_var = tk.BooleanVar(value=CONFIG.get('checkpoint', {}).get('resume', False))
+        ctk.CTkCheckBox(
+            output_frame,
+            text="Skip cards that are already up to date (resume)",
+            variable=self.resume_var
+        ).pack(pady=(0, 8), padx=20, anchor="w")
+        
+        # Print sheets instead of one PNG per card
+        imposition = ImpositionSettings.from_config(CONFIG)
+        self.impose_var = tk.BooleanVar(value=imposition.enabled)
+        ctk.CTkCheckBox(
+            output_frame,
+            text=f"Impose onto {imposition.sheet} print sheets ({imposition.format.upper()} with crop marks)",
+            variable=self.impose_var
+        ).pack(pady=(0, 8), padx=20, anchor="w")
+        
+        # Vector cards instead of PNGs
+        vector = VectorSettings.from_config(CONFIG)
+        self.vector_var = tk.BooleanVar(value=vector.enabled)
+        ctk.CTkCheckBox(
+            output_frame,
+            text=f"Vector cards ({vector.format.upper()}: sharp barcodes and text, background embedded once)",
+            variable=self.vector_var
+        ).pack(pady=(0, 8), padx=20, anchor="w")
+    
+    def setup_generation_controls(self):
+        """Setup generation control buttons"""
+        generate_frame = ctk.CTkFrame(self.scrollable_frame, fg_color="#1E1E1E", corner_radius=12)
+        generate_frame.pack(pady=(5, 5), padx=20, fill="x")
+        
+        # Button grid for Generate
+        btn_grid = ctk.CTkFrame(generate_frame, fg_color="transparent")
+        btn_grid.pack(pady=(8, 8), padx=20, fill="x")
+        
+        self.generate_btn = ctk.CTkButton(btn_grid, text="Generate Gift Cards", command=self.threaded_generate, height=40)
+        self.generate_btn.pack(fill="x", expand=True)
+        
+        self.generate_loading = ctk.CTkLabel(generate_frame, text="", font=("Arial", 12), text_color="#00BFFF")
+        self.generate_loading.pack(pady=(3, 8), padx=20, fill="x")
+    
+    def setup_log_section(self):
+        """Setup log section"""
+        log_frame = ctk.CTkFrame(self.scrollable_frame, fg_color="#1E1E1E", corner_radius=12)
+        log_frame.pack(pady=(5, 10), padx=20, fill="both", expand=True)
+        
+        log_header = ctk.CTkFrame(log_frame, fg_color="transparent")
+        log_header.pack(fill="x", padx=20, pady=(8, 5))
+        
+        ctk.CTkLabel(log_header, text="📝 Generation Log", font=("Segoe UI", 14, "bold")).pack(side="left")
+        
+        # Add toggle button for log visibility
+        self.log_visible = True
+        self.toggle_log_btn = ctk.CTkButton(log_header, text="Hide Log", command=self.toggle_log_visibility, width=80, height=25)
+        self.toggle_log_btn.pack(side="right", padx=(5, 0))
+        
+        clear_log_btn = ctk.CTkButton(log_header, text="Clear Log", command=self.clear_log, width=80, height=25)
+        clear_log_btn.pack(side="right")
+        
+        # Log container with minimum height
+        self.log_container = ctk.CTkFrame(log_frame, fg_color="transparent")
+        self.log_container.pack(fill="both", expand=True, padx=20, pady=(3, 8))
+        
+        self.log_box = ctk.CTkTextbox(self.log_container, state="disabled", fg_color="#1E1E1E", text_color="#CCCCCC", wrap="word", height=250)
+        self.log_box.pack(fill="both", expand=True)
+        
+        # Add some bottom padding to ensure content is always visible
+        bottom_spacer = ctk.CTkFrame(self.scrollable_frame, height=20, fg_color="transparent")
+        bottom_spacer.pack(fill="x")
+    
+    def setup_event_bindings(self):
+        """Setup event bindings for live preview updates"""
+        # Bind events for live preview updates
+        self.barcode_position_var.trace_add('write', self.update_live_preview)
+        self.barcode_size_var.trace_add('write', self.update_live_preview)
+        self.barcode_x.trace_add('write', self.update_live_preview)
+        self.barcode_y.trace_add('write', self.update_live_preview)
+        self.text_position_var.trace_add('write', self.update_live_preview)
+        self.text_background_var.trace_add('write', self.update_live_preview)
+        self.text_alignment_var.trace_add('write', self.update_live_preview)
+        self.text_scale.trace_add('write', self.update_live_preview)
+        self.text_x.trace_add('write', self.update_live_preview)
+        self.text_y.trace_add('write', self.update_live_preview)
+        
+        # Initialize position controls
+        self.on_position_change()
+    
+    def log(self, msg):
+        """Log a message (safe to call from any thread)"""
+        self.post_event("log", msg)
+    
+    def post_event(self, kind, payload=None):
+        """Queue a UI event for the Tk thread (safe to call from any thread)"""
+        self.ui_events.put((kind, payload))
+    
+    def process_ui_events(self):
+        """Apply queued worker events on the Tk thread, once per frame"""
+        log_lines = []
+        try:
+            for _ in range(UI_EVENTS_PER_FRAME):
+                kind, payload = self.ui_events.get_nowait()
+                if kind == "log":
+                    log_lines.append(payload)
+                elif kind == "status":
+                    self.generate_loading.configure(text=payload)
+                elif kind == "toast":
+                    show_toast(self.scrollable_frame, payload, 5000, "#00FF00")
+                elif kind == "batch_started":
+                    self.batch_progress = payload
+                elif kind == "batch_finished":
+                    self.batch_progress = None
+                    self.generating = False
+                    self.generate_btn.configure(state="normal")
+                    self.generate_loading.configure(text="")
+        except queue.Empty:
+            pass
+        
+        if log_lines:
+            self.append_log_lines(log_lines)
+        
+        # Progress is sampled rather than queued per card, so it costs one label update per frame
+        if self.batch_progress is not None:
+            self.generate_loading.configure(text=self.batch_progress.describe())
+        
+        self.after(UI_FRAME_MS, self.process_ui_events)
+    
+    def append_log_lines(self, lines):
+        """Append lines to the log in one insert, dropping the oldest beyond LOG_MAX_LINES"""
+        self.log_box.configure(state="normal")
+        self.log_box.insert("end", "\n".join(lines) + "\n")
+        # The textbox always ends with an empty line after the last newline
+        line_count = int(self.log_box.index("end-1c").split(".")[0]) - 1
+        if line_count > LOG_MAX_LINES:
+            self.log_box.delete("1.0", f"{line_count - LOG_MAX_LINES + 1}.0")
+        self.log_box.see("end")
+        self.log_box.configure(state="disabled")
+    
+    def select_background(self):
+        """Select background image file"""
+        file_path = filedialog.askopenfilename(
+            title="Select Background Image",
+            filetypes=[("Image files", "*.png *.jpg *.jpeg"), ("All files", "*.*")]
+        )
+        if file_path:
+            self.background_path = file_path
+            self.bg_path_var.set(os.path.basename(file_path))
+            self.log(f"✅ Background image selected: {os.path.basename(file_path)}")
+            # Update live preview with new background
+            self.update_live_preview()
+    
+    def select_data_file(self):
+        """Select data file (CSV or Excel)"""
+        file_path = filedialog.askopenfilename(
+            title="Select Data File",
+            filetypes=[("CSV files", "*.csv"), ("Excel files", "*.xlsx *.xls"), ("All files", "*.*")]
+        )
+        if file_path:
+            self.data_path = file_path
+            self.data_path_var.set(os.path.basename(file_path))
+            self.log(f"✅ Data file selected: {os.path.basename(file_path)}")
+            # Update live preview with new data
+            self.update_live_preview()
+    
+    def select_output_folder(self):
+        """Select output folder"""
+        folder_path = filedialog.askdirectory(title="Select Output Folder")
+        if folder_path:
+            self.output_path = folder_path
+            self.output_path_var.set(os.path.basename(folder_path))
+            self.log(f"✅ Output folder selected: {os.path.basename(folder_path)}")
+    
+    def threaded_generate(self):
+        """Generate gift cards in a separate thread"""
+        if self.generating:
+            return
+        
+        if not self.background_path:
+            self.log("❌ Please select a background image")
+            return
+        
+        if not self.data_path:
+            self.log("❌ Please select a data file")
+            return
+        
+        if not self.output_path:
+            self.log("❌ Please select an output folder")
+            return
+        
+        # Snapshot every setting on the Tk thread; the worker must not touch widgets or Tk variables
+        try:
+            layout = self.get_layout_snapshot()
+        except ValueError as e:
+            self.log(f"❌ Invalid layout settings: {str(e)}")
+            return
+        sink = next((key for key, label in SINK_LABELS.items() if label == self.sink_var.get()), "files")
+        output_settings = replace(OutputSettings.from_config(CONFIG), fast=self.fast_png_var.get(), sink=sink)
+        checkpoint = replace(CheckpointSettings.from_config(CONFIG), resume=self.resume_var.get())
+        imposition = replace(ImpositionSettings.from_config(CONFIG), enabled=self.impose_var.get())
+        if imposition.enabled:
+            try:
+                sheet_geometry(imposition)
+            except ValueError as e:
+                self.log(f"❌ Invalid imposition settings: {str(e)}")
+                return
+            fit_warning = describe_card_fit(imposition, self.background_path)
+            if fit_warning:
+                self.log(fit_warning)
+        vector = replace(VectorSettings.from_config(CONFIG), enabled=self.vector_var.get())
+        if vector.enabled and imposition.enabled:
+            self.log("❌ Vector cards can't be imposed onto print sheets; turn off one of them")
+            return
+        if vector.enabled:
+            try:
+                validate_vector(vector, compile_layout(layout, self.background_path))
+            except ValueError as e:
+                self.log(f"❌ Invalid vector settings: {str(e)}")
+                return
+        unresumable = unresumable_output(checkpoint, output_settings, imposition, vector)
+        if unresumable:
+            self.log(f"❌ {unresumable}; untick resume to render again")
+            return
+        columns = (
+            safe_get_input(self.barcode_col, "barcode"),
+            safe_get_input(self.member_col, "member_number"),
+            safe_get_input(self.verification_col, "pin")
+        )
+        
+        self.generating = True
+        self.generate_btn.configure(state="disabled")
+        threading.Thread(
+            target=self.generate_gift_cards,
+            args=(layout, output_settings, checkpoint, imposition, vector, columns, self.background_path, self.data_path, self.output_path),
+            daemon=True
+        ).start()
+    
+    def on_column_config_change(self, event=None):
+        """Handle column configuration changes"""
+        self.update_live_preview()
+    
+    def on_barcode_position_change(self, value=None):
+        """Handle barcode position change"""
+        if self.barcode_position_var.get() == "Custom":
+            self.barcode_custom_frame.pack(fill="x", padx=10, pady=2)
+        else:
+            self.barcode_custom_frame.pack_forget()
+            # Set preset positions
+            positions = {
+                "Top-Left": ("2", "2"),
+                "Top-Right": ("98", "2"),
+                "Bottom-Left": ("2", "98"),
+                "Bottom-Right": ("98", "98"),
+                "Center": ("50", "50")
+            }
+            pos = self.barcode_position_var.get()
+            if pos in positions:
+                x, y = positions[pos]
+                self.barcode_x.set(x)
+                self.barcode_y.set(y)
+        self.update_live_preview()
+    
+    def on_text_position_change(self, value=None):
+        """Handle text position change"""
+        if self.text_position_var.get() == "Custom":
+            self.text_custom_frame.pack(fill="x", padx=10, pady=2)
+        else:
+            self.text_custom_frame.pack_forget()
+            # Set preset positions (these values are now only used for custom positioning)
+            # The actual corner positioning is handled by CompiledLayout.text_origin
+            positions = {
+                "Top-Left": ("10", "10"),
+                "Top-Right": ("90", "10"),
+                "Bottom-Left": ("10", "90"),
+                "Bottom-Right": ("90", "90"),
+                "Center": ("50", "50")
+            }
+            pos = self.text_position_var.get()
+            if pos in positions:
+                x, y = positions[pos]
+                self.text_x.set(x)
+                self.text_y.set(y)
+        self.update_live_preview()
+    
+    def on_background_change(self, value=None):
+        """Handle background change"""
+        if self.text_background_var.get() == "Custom Color":
+            self.custom_color_frame.pack(fill="x", padx=10, pady=2)
+        else:
+            self.custom_color_frame.pack_forget()
+        
+        self.update_live_preview()
+    
+    
+    def on_custom_color_change(self, event=None):
+        """Handle custom color change"""
+        color = self.custom_color_entry.get().strip()
+        if color.startswith('#') and len(color) == 7:
+            try:
+                # Validate color
+                self.color_preview_btn.configure(fg_color=color)
+                self.custom_bg_color = color
+                self.update_live_preview()
+            except:
+                pass
+    
+    def open_color_picker(self):
+        """Open color picker dialog"""
+        color = colorchooser.askcolor(color=self.custom_bg_color)
+        if color[1]:  # If user didn't cancel
+            self.custom_bg_color = color[1]
+            self.custom_color_entry.delete(0, tk.END)
+            self.custom_color_entry.insert(0, self.custom_bg_color)
+            self.color_preview_btn.configure(fg_color=self.custom_bg_color)
+            self.update_live_preview()
+    
+    def on_position_change(self, event=None):
+        """Handle position changes"""
+        self.update_live_preview()
+    
+    def on_text_scale_change(self, value=None):
+        """Handle text scale changes"""
+        self.update_live_preview()
+    
+    def reset_positions(self):
+        """Reset all positions to default"""
+        self.barcode_position_var.set("Bottom-Right")
+        self.barcode_x.set("85")
+        self.barcode_y.set("85")
+        self.barcode_size_var.set("Medium")
+        
+        self.text_position_var.set("Bottom-Left")
+        self.text_x.set("10")
+        self.text_y.set("90")
+        self.text_background_var.set("White Box")
+        self.text_alignment_var.set("Left")
+        self.text_scale.set(100.0)
+        
+        self.update_live_preview()
+    
+    def update_live_preview(self, *args):
+        """Schedule a preview refresh, coalescing bursts of changes into one render"""
+        if self.preview_update_timer is not None:
+            self.after_cancel(self.preview_update_timer)
+        self.preview_update_timer = self.after(PREVIEW_DEBOUNCE_MS, self.refresh_preview_canvas)
+    
+    def refresh_preview_canvas(self):
+        """Refresh the preview canvas with current settings"""
+        self.preview_update_timer = None
+        
+        if not self.background_path:
+            # Just show empty canvas with background color
+            self.preview_generation += 1
+            self.clear_preview_layers()
+            return
+        
+        # Show background only until the barcode column is configured
+        layout = None
+        if safe_get_input(self.barcode_col, ""):
+            try:
+                layout = self.get_layout_snapshot()
+            except ValueError:
+                # A coordinate is mid-edit (e.g. empty); keep the last frame
+                return
+        
+        # Render off the Tk thread; only the newest request is ever shown
+        self.preview_generation += 1
+        if self.preview_future is not None:
+            self.preview_future.cancel()
+        self.preview_future = self.preview_executor.submit(
+            self.render_preview_layers,
+            self.preview_generation,
+            self.background_path,
+            layout,
+            dict(self.preview_layer_keys)
+        )
+        if not self.preview_polling:
+            self.preview_polling = True
+            self.after(PREVIEW_POLL_MS, self.poll_preview_result)
+    
+    def render_preview_layers(self, generation, background_path, layout, shown_keys):
+        """Render the preview layers on the preview thread (no Tk access here).
+        
+        Only layers whose content key differs from shown_keys get a new
+        sprite; the others are just repositioned.
+        """
+        size = (self.canvas_width, self.canvas_height)
+        compiled = compile_layout(layout, background_path) if layout is not None else None
+        frame = {
+            "generation": generation,
+            "keys": preview_layer_keys(background_path, size, compiled),
+            "images": {},
+            "positions": {"background": (0, 0)},
+            "geometry": None
+        }
+        
+        if frame["keys"]["background"] != shown_keys.get("background"):
+            frame["images"]["background"] = load_background_proxy(background_path, size)
+        if compiled is None:
+            return frame
+        
+        barcode_data, member_number, verification_code, card_number = PREVIEW_SAMPLE
+        sprites = {
+            "barcode": preview_barcode_sprite(compiled, size, barcode_data),
+            "text": preview_text_sprite(compiled, size, member_number, verification_code, card_number)
+        }
+        for name, sprite in sprites.items():
+            frame["positions"][name] = sprite.position
+            if frame["keys"][name] != shown_keys.get(name):
+                frame["images"][name] = sprite.image
+        
+        # Card-space boxes let drag and drop turn canvas moves into percentages
+        frame["geometry"] = {
+            "card_size": compiled.size,
+            "scale": (size[0] / compiled.size[0], size[1] / compiled.size[1]),
+            "text_alignment": layout.text_alignment,
+            "barcode": sprites["barcode"].card_box,
+            "text": sprites["text"].card_box
+        }
+        return frame
+    
+    def poll_preview_result(self):
+        """Show the finished preview frame on the Tk thread, dropping stale frames"""
+        future = self.preview_future
+        if future is not None and not future.done():
+            self.after(PREVIEW_POLL_MS, self.poll_preview_result)
+            return
+        
+        self.preview_polling = False
+        self.preview_future = None
+        if future is None or future.cancelled():
+            return
+        
+        try:
+            frame = future.result()
+        except Exception as e:
+            self.log(f"❌ Preview error: {str(e)}")
+            return
+        
+        if frame["generation"] != self.preview_generation:
+            return
+        self.apply_preview_frame(frame)
+    
+    def apply_preview_frame(self, frame):
+        """Update the canvas layers from a rendered frame"""
+        for name in PREVIEW_LAYERS:
+            item = self.preview_items.get(name)
+            if name not in frame["keys"]:
+                # Layer not shown in this frame (e.g. no barcode column yet)
+                if item is not None:
+                    self.preview_canvas.delete(item)
+                    del self.preview_items[name]
+                self.preview_photos.pop(name, None)
+                continue
+            
+            image = frame["images"].get(name)
+            if image is not None:
+                self.preview_photos[name] = ImageTk.PhotoImage(image)
+            
+            x, y = frame["positions"][name]
+            if item is None:
+                self.preview_items[name] = self.preview_canvas.create_image(
+                    x, y, image=self.preview_photos[name], anchor="nw", tags=(name,)
+                )
+            else:
+                if image is not None:
+                    self.preview_canvas.itemconfigure(item, image=self.preview_photos[name])
+                self.preview_canvas.coords(item, x, y)
+        
+        # Keep the stacking order: background, barcode, text
+        for name in PREVIEW_LAYERS:
+            if name in self.preview_items:
+                self.preview_canvas.tag_raise(self.preview_items[name])
+        
+        self.preview_layer_keys = frame["keys"]
+        self.preview_geometry = frame["geometry"]
+    
+    def clear_preview_layers(self):
+        """Remove every preview layer from the canvas"""
+        self.preview_canvas.delete("all")
+        self.preview_items = {}
+        self.preview_photos = {}
+        self.preview_layer_keys = {}
+        self.preview_geometry = None
+    
+    def on_canvas_click(self, event):
+        """Start dragging the barcode or text block under the cursor"""
+        self.dragging_item = None
+        if not self.preview_geometry:
+            return
+        for item in reversed(self.preview_canvas.find_overlapping(event.x, event.y, event.x, event.y)):
+            tags = self.preview_canvas.gettags(item)
+            for name in ("text", "barcode"):
+                if name in tags:
+                    self.dragging_item = name
+                    self.drag_data = {"x": event.x, "y": event.y, "start_x": event.x, "start_y": event.y}
+                    return
+    
+    def on_canvas_drag(self, event):
+        """Move the dragged layer; only its canvas coordinates change"""
+        if not self.dragging_item:
+            return
+        self.preview_canvas.move(
+            self.preview_items[self.dragging_item],
+            event.x - self.drag_data["x"],
+            event.y - self.drag_data["y"]
+        )
+        self.drag_data["x"] = event.x
+        self.drag_data["y"] = event.y
+    
+    def on_canvas_release(self, event):
+        """Drop the dragged layer and store its new position as Custom percentages"""
+        name = self.dragging_item
+        self.dragging_item = None
+        geometry = self.preview_geometry
+        if not name or not geometry:
+            return
+        
+        scale_x, scale_y = geometry["scale"]
+        dx = (event.x - self.drag_data["start_x"]) / scale_x
+        dy = (event.y - self.drag_data["start_y"]) / scale_y
+        if not dx and not dy:
+            return
+        
+        card_width, card_height = geometry["card_size"]
+        x1, y1, x2, y2 = geometry[name]
+        if name == "barcode":
+            # Barcode percentages position its center
+            center_x = x1 + dx + (x2 - x1) // 2
+            center_y = y1 + dy + (y2 - y1) // 2
+            self.barcode_position_var.set("Custom")
+            self.barcode_x.set(f"{max(0.0, min(100.0, center_x / card_width * 100)):.1f}")
+            self.barcode_y.set(f"{max(0.0, min(100.0, center_y / card_height * 100)):.1f}")
+            self.on_barcode_position_change()
+        else:
+            # Text percentages position the aligned edge horizontally and the
+            # middle vertically, measured on the text inside the padded box
+            text_x = x1 + dx + TEXT_PADDING
+            text_y = y1 + dy + TEXT_PADDING
+            text_width = (x2 - x1) - 2 * TEXT_PADDING
+            text_height = (y2 - y1) - 2 * TEXT_PADDING
+            if geometry["text_alignment"] == "Center":
+                text_x += text_width // 2
+            elif geometry["text_alignment"] == "Right":
+                text_x += text_width
+            text_y += text_height // 2
+            self.text_position_var.set("Custom")
+            self.text_x.set(f"{max(0.0, min(100.0, text_x / card_width * 100)):.1f}")
+            self.text_y.set(f"{max(0.0, min(100.0, text_y / card_height * 100)):.1f}")
+            self.on_text_position_change()
+    
+    def toggle_log_visibility(self):
+        """Toggle log visibility"""
+        if self.log_visible:
+            self.log_container.pack_forget()
+            self.toggle_log_btn.configure(text="Show Log")
+            self.log_visible = False
+        else:
+            self.log_container.pack(fill="both", expand=True, padx=20, pady=(3, 8))
+            self.toggle_log_btn.configure(text="Hide Log")
+            self.log_visible = True
+    
+    def clear_log(self):
+        """Clear the log"""
+        self.log_box.configure(state="normal")
+        self.log_box.delete("1.0", tk.END)
+        self.log_box.configure(state="disabled")
+    
+    def get_actual_barcode_size(self):
+        """Get actual barcode size based on selection"""
+        width, height = BARCODE_SIZES.get(self.barcode_size_var.get(), BARCODE_SIZES["Medium"])
+        return {"width": width, "height": height}
+    
+    def get_layout_snapshot(self):
+        """Freeze the current layout settings into a CardLayout"""
+        barcode_size = self.get_actual_barcode_size()
+        return CardLayout(
+            barcode_x=float(self.barcode_x.get()),
+            barcode_y=float(self.barcode_y.get()),
+            barcode_width=barcode_size['width'],
+            barcode_height=barcode_size['height'],
+            text_position=self.text_position_var.get(),
+            text_x=float(self.text_x.get()),
+            text_y=float(self.text_y.get()),
+            text_alignment=self.text_alignment_var.get(),
+            text_background=self.text_background_var.get(),
+            text_scale=float(self.text_scale.get()),
+            custom_bg_color=self.custom_bg_color,
+            font_family=CONFIG['business'].get('default_font', "Arial")
+        )
+    
+    def generate_gift_cards(self, layout, output_settings, checkpoint, imposition, vector, columns, background_path, data_path, output_path):
+        """Generate all gift cards from data file (runs on a worker thread)"""
+        try:
+            self.post_event("status", "🔄 Reading data file...")
+            
+            # Read data file and validate columns exist
+            try:
+                total, rows = load_card_rows(data_path, *columns)
+            except ValueError as e:
+                self.log(f"❌ {str(e)}")
+                return
+            
+            # Check every barcode up front so bad rows are reported together
+            preflight = PreflightSettings.from_config(CONFIG)
+            if preflight.enabled:
+                self.post_event("status", "🔎 Checking barcodes...")
+                report = preflight_data_file(data_path, columns[0], preflight)
+                for line in describe_preflight(report, preflight.max_listed):
+                    self.log(line)
+                if preflight.strict and report.has_errors:
+                    self.log("❌ Barcode preflight failed; nothing was rendered")
+                    return
+            
+            self.log(f"🔄 Generating {total if total is not None else 'all'} gift cards...")
+            progress = BatchProgress(total)
+            self.post_event("batch_started", progress)
+            
+            # Generate cards on the process pool
+            rendering = CONFIG.get('rendering', {})
+            profile = ProfileSettings.from_config(CONFIG)
+            batch_stats = {}
+            for card_number, filename, error, skipped in render_batch(
+                rows,
+                layout,
+                background_path,
+                output_path,
+                workers=rendering.get('workers', 0),
+                chunk_size=rendering.get('chunk_size', 64),
+                stats=batch_stats,
+                output_settings=output_settings,
+                profile=profile,
+                checkpoint=checkpoint,
+                imposition=imposition,
+                vector=vector
+            ):
+                progress.record(error, skipped)
+                if error:
+                    self.log(f"❌ Error generating card {card_number}: {error}")
+            
+            summary = progress.snapshot()
+            self.log(
+                f"✅ Generated {summary['succeeded']}/{summary['done'] - summary['skipped']} gift cards successfully "
+                f"in {summary['elapsed']:.1f}s ({summary['rate']:.1f} cards/s)!"
+            )
+            if summary['skipped']:
+                self.log(f"⏭️ Skipped {summary['skipped']} cards that were already up to date")
+            if "barcode_cache" in batch_stats:
+                self.log(describe_cache_stats("Barcode cache", batch_stats["barcode_cache"]))
+            if "sheets" in batch_stats:
+                self.log(describe_sheets(batch_stats["sheets"], imposition))
+            elif "vector" in batch_stats:
+                self.log(describe_vector(batch_stats["vector"], vector))
+            else:
+                for line in describe_output(batch_stats, output_settings, output_path):
+                    self.log(line)
+            for line in report_profile(batch_stats, output_path, profile):
+                self.log(line)
+            
+            if summary['succeeded'] > 0:
+                self.post_event("toast", f"🎉 {summary['succeeded']} gift cards generated!")
+            
+        except Exception as e:
+            self.log(f"❌ Generation error: {str(e)}")
+        finally:
+            self.post_event("batch_finished")
\ No newline at end of file
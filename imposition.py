@@ -0,0 +1,410 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import math
+import os
+import threading
+import zlib
+
+from PIL import Image, ImageDraw, ImageOps, TiffImagePlugin
+
+# --- Print Imposition ---
+# Instead of one PNG per card, cards are tiled N x M onto print sheets with
+# bleed and crop marks and streamed into a multi-page PDF or TIFF. Rendering
+# processes turn each card into a bleed-extended tile at the sheet resolution
+# (TilePool); the parent places tiles in row order (SheetWriter) and writes
+# each sheet as soon as it is full, so only one sheet is held in memory.
+
+MM_PER_INCH = 25.4
+SHEET_SIZES_MM = {
+    "A4": (210, 297),
+    "A3": (297, 420),
+    "SRA3": (320, 450),
+    "Letter": (215.9, 279.4)
+}
+SHEET_FORMATS = ("pdf", "tiff")
+SHEET_EXTENSIONS = {"pdf": ".pdf", "tiff": ".tif"}
+
+CROP_MARK_LENGTH_MM = 5
+CROP_MARK_OFFSET_MM = 2   # Gap between the bleed edge and the start of a mark
+CROP_MARK_WIDTH_MM = 0.25
+
+# Cards whose aspect ratio is within this fraction of the trim's are simply
+# resized; others are scaled to cover the trim and cropped around the centre
+ASPECT_TOLERANCE = 0.01
+
+@dataclass(frozen=True)
+class ImpositionSettings:
+    """Sheet, tile and file options for imposed output"""
+    enabled: bool = False
+    sheet: str = "A4"
+    orientation: str = "auto"   # "auto", "portrait" or "landscape"
+    format: str = "pdf"
+    dpi: int = 300
+    card_width_mm: float = 85.6  # ISO/IEC 7810 ID-1 (CR80)
+    card_height_mm: float = 53.98
+    bleed_mm: float = 2.0
+    gutter_mm: float = 0.0     # Extra space between neighbouring bleed areas
+    margin_mm: float = 10.0    # Unprinted border, also holds the crop marks
+    columns: int = 0           # 0 fits as many as the sheet allows
+    rows: int = 0
+    crop_marks: bool = True
+    compress_level: int = 6
+    filename: str = "gift_card_sheets"
+
+    @classmethod
+    def from_config(cls, config):
+        """Build settings from the "imposition" section of config.json"""
+        imposition = config.get('imposition', {})
+        defaults = cls()
+        return cls(
+            enabled=bool(imposition.get('enabled', defaults.enabled)),
+            sheet=str(imposition.get('sheet', defaults.sheet)),
+            orientation=str(imposition.get('orientation', defaults.orientation)).lower(),
+            format=str(imposition.get('format', defaults.format)).lower(),
+            dpi=int(imposition.get('dpi', defaults.dpi)),
+            card_width_mm=float(imposition.get('card_width_mm', defaults.card_width_mm)),
+            card_height_mm=float(imposition.get('card_height_mm', defaults.card_height_mm)),
+            bleed_mm=float(imposition.get('bleed_mm', defaults.bleed_mm)),
+            gutter_mm=float(imposition.get('gutter_mm', defaults.gutter_mm)),
+            margin_mm=float(imposition.get('margin_mm', defaults.margin_mm)),
+            columns=int(imposition.get('columns', defaults.columns)),
+            rows=int(imposition.get('rows', defaults.rows)),
+            crop_marks=bool(imposition.get('crop_marks', defaults.crop_marks)),
+            compress_level=int(imposition.get('compress_level', defaults.compress_level)),
+            filename=str(imposition.get('filename', defaults.filename))
+        )
+
+    def px(self, mm):
+        """Convert millimetres to pixels at the sheet resolution"""
+        return int(round(mm / MM_PER_INCH * self.dpi))
+
+def _grid_fit(sheet_w, sheet_h, settings):
+    """Number of (columns, rows) of bleed-extended cards that fit on a sheet in mm"""
+    pitch_x = settings.card_width_mm + 2 * settings.bleed_mm + settings.gutter_mm
+    pitch_y = settings.card_height_mm + 2 * settings.bleed_mm + settings.gutter_mm
+    usable_w = sheet_w - 2 * settings.margin_mm + settings.gutter_mm
+    usable_h = sheet_h - 2 * settings.margin_mm + settings.gutter_mm
+    return max(0, math.floor(usable_w / pitch_x)), max(0, math.floor(usable_h / pitch_y))
+
+@dataclass(frozen=True)
+class SheetGeometry:
+    """Pixel geometry of an imposed sheet"""
+    size: tuple             # Sheet (width, height)
+    columns: int
+    rows: int
+    trim_size: tuple        # Card (width, height) without bleed
+    bleed: int
+    pitch: tuple            # Distance between neighbouring tile origins
+    origin: tuple           # Top-left of the first tile, bleed included
+
+    @property
+    def per_sheet(self):
+        return self.columns * self.rows
+
+    def tile_origin(self, slot):
+        """Top-left of the bleed-extended tile in a row-major slot"""
+        row, column = divmod(slot, self.columns)
+        return self.origin[0] + column * self.pitch[0], self.origin[1] + row * self.pitch[1]
+
+def sheet_geometry(settings):
+    """Work out the sheet orientation and card grid.
+
+    Raises ValueError for an unknown sheet size or format, or a grid that
+    doesn't fit the sheet.
+    """
+    if settings.format not in SHEET_FORMATS:
+        raise ValueError(f"Unknown sheet format: {settings.format} (choose from {', '.join(SHEET_FORMATS)})")
+    if settings.sheet not in SHEET_SIZES_MM:
+        raise ValueError(f"Unknown sheet size: {settings.sheet} (choose from {', '.join(SHEET_SIZES_MM)})")
+    portrait = SHEET_SIZES_MM[settings.sheet]
+    landscape = (portrait[1], portrait[0])
+    if settings.orientation == "portrait":
+        candidates = [portrait]
+    elif settings.orientation == "landscape":
+        candidates = [landscape]
+    else:
+        candidates = [portrait, landscape]
+
+    # Pick the orientation holding the most cards
+    best = None
+    for sheet_w, sheet_h in candidates:
+        columns, rows = _grid_fit(sheet_w, sheet_h, settings)
+        if best is None or columns * rows > best[2] * best[3]:
+            best = (sheet_w, sheet_h, columns, rows)
+    sheet_w, sheet_h, columns, rows = best
+
+    if settings.columns or settings.rows:
+        wanted_columns = settings.columns or columns
+        wanted_rows = settings.rows or rows
+        if wanted_columns > columns or wanted_rows > rows:
+            raise ValueError(
+                f"{wanted_columns}x{wanted_rows} cards don't fit on {settings.sheet} "
+                f"(at most {columns}x{rows} with the current bleed and margins)"
+            )
+        columns, rows = wanted_columns, wanted_rows
+    if columns < 1 or rows < 1:
+        raise ValueError(f"No card fits on {settings.sheet} with the current bleed and margins")
+
+    trim = (settings.px(settings.card_width_mm), settings.px(settings.card_height_mm))
+    bleed = settings.px(settings.bleed_mm)
+    gutter = settings.px(settings.gutter_mm)
+    size = (settings.px(sheet_w), settings.px(sheet_h))
+    pitch = (trim[0] + 2 * bleed + gutter, trim[1] + 2 * bleed + gutter)
+    # Centre the grid on the sheet
+    grid_w = columns * pitch[0] - gutter
+    grid_h = rows * pitch[1] - gutter
+    origin = ((size[0] - grid_w) // 2, (size[1] - grid_h) // 2)
+    return SheetGeometry(size, columns, rows, trim, bleed, pitch, origin)
+
+def _aspect_error(card_size, trim_size):
+    """Relative difference between a card's aspect ratio and the trim's"""
+    return abs((card_size[0] * trim_size[1]) / (card_size[1] * trim_size[0]) - 1)
+
+def make_tile(card_image, geometry):
+    """Scale a card to the trim size and extend its edge pixels into the bleed.
+
+    A card with another aspect ratio than the trim is scaled to cover it and
+    cropped around the centre instead of being squashed.
+    """
+    trim_w, trim_h = geometry.trim_size
+    bleed = geometry.bleed
+    card = card_image.convert("RGB")
+    if card.size != (trim_w, trim_h):
+        if _aspect_error(card.size, geometry.trim_size) > ASPECT_TOLERANCE:
+            card = ImageOps.fit(card, (trim_w, trim_h), Image.Resampling.LANCZOS)
+        else:
+            card = card.resize((trim_w, trim_h), Image.Resampling.LANCZOS)
+    if not bleed:
+        return card
+
+    tile = Image.new("RGB", (trim_w + 2 * bleed, trim_h + 2 * bleed))
+    tile.paste(card, (bleed, bleed))
+    # Stretch the outermost row/column of pixels across each bleed strip
+    tile.paste(card.crop((0, 0, trim_w, 1)).resize((trim_w, bleed)), (bleed, 0))
+    tile.paste(card.crop((0, trim_h - 1, trim_w, trim_h)).resize((trim_w, bleed)), (bleed, bleed + trim_h))
+    tile.paste(tile.crop((bleed, 0, bleed + 1, tile.height)).resize((bleed, tile.height)), (0, 0))
+    tile.paste(tile.crop((bleed + trim_w - 1, 0, bleed + trim_w, tile.height)).resize((bleed, tile.height)), (bleed + trim_w, 0))
+    return tile
+
+def encode_tile(tile):
+    """Pack a tile for the trip back from a rendering process"""
+    return tile.size, zlib.compress(tile.tobytes(), 1)
+
+def decode_tile(packed):
+    """Unpack a tile made by encode_tile"""
+    size, data = packed
+    return Image.frombytes("RGB", size, zlib.decompress(data))
+
+class TilePool:
+    """Worker-side stand-in for PNGWriterPool that turns cards into packed tiles.
+
+    submit() returns a Future of the packed tile instead of writing a file;
+    the path is ignored.
+    """
+
+    def __init__(self, settings, geometry):
+        self.settings = settings
+        self.geometry = geometry
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.writer_threads),
+            thread_name_prefix="tile-maker"
+        )
+        self._slots = threading.BoundedSemaphore(max(1, settings.queue_size))
+
+    def submit(self, card, path):
+        """Queue a RenderedCard to be turned into a tile, returning a Future of the packed tile"""
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._make, card.image)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _make(self, image):
+        return encode_tile(make_tile(image, self.geometry))
+
+    def close(self):
+        """Wait for pending tiles and stop the threads"""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class PDFPageStream:
+    """Minimal PDF writer that appends one full-page RGB image per page.
+
+    Each page is written out and released as soon as it is added; only the
+    object offsets are kept until the page tree and xref table are written.
+    """
+
+    def __init__(self, path, dpi, compress_level=6):
+        self.dpi = dpi
+        self.compress_level = compress_level
+        self._file = open(path, 'wb')
+        self._offsets = {}
+        self._page_ids = []
+        self._next_id = 3  # 1 is the catalog, 2 the page tree written on close
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+    def _allocate(self):
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _write_object(self, obj_id, body, stream=None):
+        self._offsets[obj_id] = self._file.tell()
+        self._file.write(f"{obj_id} 0 obj\n".encode("ascii") + body)
+        if stream is not None:
+            self._file.write(b"\nstream\n")
+            self._file.write(stream)
+            self._file.write(b"\nendstream")
+        self._file.write(b"\nendobj\n")
+
+    def add_page(self, image):
+        """Append an RGB image as a page sized from its pixels and the stream's dpi"""
+        width_pt = image.width * 72 / self.dpi
+        height_pt = image.height * 72 / self.dpi
+        pixels = zlib.compress(image.tobytes(), self.compress_level)
+
+        image_id, content_id, page_id = self._allocate(), self._allocate(), self._allocate()
+        self._write_object(
+            image_id,
+            (f"<< /Type /XObject /Subtype /Image /Width {image.width} /Height {image.height} "
+             f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /FlateDecode /Length {len(pixels)} >>").encode("ascii"),
+            pixels
+        )
+        content = f"q {width_pt:.3f} 0 0 {height_pt:.3f} 0 0 cm /Im0 Do Q".encode("ascii")
+        self._write_object(content_id, f"<< /Length {len(content)} >>".encode("ascii"), content)
+        self._write_object(
+            page_id,
+            (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width_pt:.3f} {height_pt:.3f}] "
+             f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> /Contents {content_id} 0 R >>").encode("ascii")
+        )
+        self._page_ids.append(page_id)
+
+    def close(self):
+        """Write the page tree, xref table and trailer"""
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        self._write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>".encode("ascii"))
+        xref_offset = self._file.tell()
+        self._file.write(f"xref\n0 {self._next_id}\n0000000000 65535 f \n".encode("ascii"))
+        for obj_id in range(1, self._next_id):
+            self._file.write(f"{self._offsets[obj_id]:010d} 00000 n \n".encode("ascii"))
+        self._file.write(
+            f"trailer\n<< /Size {self._next_id} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("ascii")
+        )
+        self._file.close()
+
+class TIFFPageStream:
+    """Multi-page TIFF writer that appends one deflate-compressed frame per page.
+
+    Pillow has no way to set libtiff's deflate level, so frames use its default.
+    """
+
+    def __init__(self, path, dpi):
+        self.dpi = dpi
+        self._file = open(path, 'w+b')
+        self._writer = TiffImagePlugin.AppendingTiffWriter(self._file)
+
+    def add_page(self, image):
+        image.save(self._writer, "TIFF", compression="tiff_adobe_deflate", dpi=(self.dpi, self.dpi))
+        self._writer.newFrame()
+
+    def close(self):
+        self._writer.close()
+        self._file.close()
+
+def draw_crop_marks(sheet, geometry, settings):
+    """Draw trim marks in the margin around the card grid"""
+    draw = ImageDraw.Draw(sheet)
+    length = settings.px(CROP_MARK_LENGTH_MM)
+    offset = settings.px(CROP_MARK_OFFSET_MM)
+    width = max(1, settings.px(CROP_MARK_WIDTH_MM))
+    bleed = geometry.bleed
+    trim_w, trim_h = geometry.trim_size
+
+    left, top = geometry.origin
+    right = geometry.tile_origin(geometry.columns - 1)[0] + trim_w + 2 * bleed
+    bottom = geometry.tile_origin((geometry.rows - 1) * geometry.columns)[1] + trim_h + 2 * bleed
+
+    for column in range(geometry.columns):
+        tile_x = geometry.tile_origin(column)[0]
+        for x in (tile_x + bleed, tile_x + bleed + trim_w - 1):
+            draw.line([(x, top - offset - length), (x, top - offset)], fill="black", width=width)
+            draw.line([(x, bottom + offset), (x, bottom + offset + length)], fill="black", width=width)
+    for row in range(geometry.rows):
+        tile_y = geometry.tile_origin(row * geometry.columns)[1]
+        for y in (tile_y + bleed, tile_y + bleed + trim_h - 1):
+            draw.line([(left - offset - length, y), (left - offset, y)], fill="black", width=width)
+            draw.line([(right + offset, y), (right + offset + length, y)], fill="black", width=width)
+
+class SheetWriter:
+    """Place tiles on sheets in order and stream each full sheet to the output file"""
+
+    def __init__(self, settings, output_path, geometry=None):
+        self.settings = settings
+        self.geometry = geometry or sheet_geometry(settings)
+        self.path = os.path.join(output_path, settings.filename + SHEET_EXTENSIONS[settings.format])
+        if settings.format == "pdf":
+            self._stream = PDFPageStream(self.path, settings.dpi, settings.compress_level)
+        else:
+            self._stream = TIFFPageStream(self.path, settings.dpi)
+        self.pages = 0
+
+        # Marks are the same on every sheet, so draw them once onto a blank template
+        self._template = Image.new("RGB", self.geometry.size, "white")
+        if settings.crop_marks:
+            draw_crop_marks(self._template, self.geometry, settings)
+        self._sheet = None
+        self._slot = 0
+
+    def add(self, card_number, filename, packed_tile):
+        """Place a card's packed tile in the next slot, returning its "file p.N" location"""
+        if self._sheet is None:
+            self._sheet = self._template.copy()
+            self._slot = 0
+        self._sheet.paste(decode_tile(packed_tile), self.geometry.tile_origin(self._slot))
+        self._slot += 1
+        location = f"{os.path.basename(self.path)} p.{self.pages + 1}"
+        if self._slot >= self.geometry.per_sheet:
+            self._flush()
+        return location
+
+    def _flush(self):
+        if self._sheet is not None:
+            self._stream.add_page(self._sheet)
+            self.pages += 1
+            self._sheet = None
+
+    def close(self):
+        """Write the last, partly filled sheet and finish the file"""
+        self._flush()
+        self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def describe_card_fit(settings, background_path):
+    """Warning line when cards on this background will be cropped to the trim, or None"""
+    with Image.open(background_path) as img:
+        card_size = img.size
+    trim = (settings.card_width_mm, settings.card_height_mm)
+    if _aspect_error(card_size, trim) <= ASPECT_TOLERANCE:
+        return None
+    return (f"⚠️ The {card_size[0]}×{card_size[1]} background doesn't have the shape of "
+            f"{trim[0]:g}×{trim[1]:g} mm cards; its edges will be cropped on the sheets")
+
+def describe_sheets(sheets, settings):
+    """Format the stats["sheets"] entry of a batch for the log"""
+    path, pages, geometry = sheets
+    return (f"🖨️ Wrote {pages} {settings.sheet} sheets "
+            f"({geometry.columns}×{geometry.rows} cards each) to {path}")
@@ -0,0 +1,184 @@
+from collections import deque
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+# --- Run Manifest ---
+# Every finished card is journaled in a SQLite file in the output folder under
+# a content-addressed key: the hash of its row fields and position, the layout
+# snapshot and the background file's bytes. A resumed batch skips any card
+# whose key is journaled and whose file is intact, so a run that died halfway
+# picks up where it stopped, and after editing the layout or appending rows
+# only the cards whose inputs changed are rendered again.
+
+MANIFEST_FILENAME = ".gcg_manifest.sqlite"
+MANIFEST_SCHEMA = 2
+
+# Part of every card key; bump it when a renderer change alters the pixels of
+# existing cards so their journal entries stop matching
+CARD_FORMAT_VERSION = 1
+
+@dataclass(frozen=True)
+class CheckpointSettings:
+    """Run journal options for a batch"""
+    journal: bool = True
+    resume: bool = False
+    commit_every: int = 256  # Cards per SQLite transaction
+
+    @classmethod
+    def from_config(cls, config):
+        """Build settings from the "checkpoint" section of config.json"""
+        checkpoint = config.get('checkpoint', {})
+        return cls(
+            journal=bool(checkpoint.get('journal', True)),
+            resume=bool(checkpoint.get('resume', False)),
+            commit_every=int(checkpoint.get('commit_every', 256))
+        )
+
+@lru_cache(maxsize=8)
+def _hash_file(path, mtime_ns, size):
+    """SHA-256 of a file's bytes, cached while its mtime and size are unchanged"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def file_hash(path):
+    """SHA-256 of a file's contents"""
+    stat = os.stat(path)
+    return _hash_file(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+def layout_hash(layout, background_path):
+    """Hash a layout snapshot together with the contents of its background file.
+
+    Hashing the bytes rather than the path or mtime means a re-saved or moved
+    background that looks the same keeps every card current.
+    """
+    payload = json.dumps(
+        {"version": CARD_FORMAT_VERSION, "layout": asdict(layout), "background": file_hash(background_path)},
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def card_key(row, layout_key):
+    """Content-addressed key of one card: its row fields and position plus the layout hash"""
+    payload = "\x1f".join(str(value) for value in (layout_key,) + tuple(row))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class RunManifest:
+    """SQLite journal of the cards finished in an output folder.
+
+    filter_rows() drops rows that are already done, queueing a result for each
+    so callers can still count them; record() journals newly written cards.
+    Not thread-safe: use it from the thread that consumes the batch.
+    """
+
+    def __init__(self, output_path, layout_key, resume=False, commit_every=256):
+        self.path = os.path.join(output_path, MANIFEST_FILENAME)
+        self.output_path = output_path
+        self.layout_key = layout_key
+        self.commit_every = max(1, commit_every)
+        self.skipped = 0
+        self._skipped_results = deque()
+        self._pending_keys = {}
+        self._uncommitted = 0
+
+        self._db = sqlite3.connect(self.path)
+        # WAL keeps each commit cheap; a lost tail of the journal only means re-rendering those cards
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        schema = self._db.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        if schema is None or schema[0] != str(MANIFEST_SCHEMA):
+            # Journals from older versions can't be matched against card keys; start over
+            self._db.execute("DROP TABLE IF EXISTS cards")
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('schema', ?)", (str(MANIFEST_SCHEMA),))
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cards ("
+            "card_number INTEGER PRIMARY KEY, filename TEXT NOT NULL, card_key TEXT NOT NULL, "
+            "content_hash TEXT NOT NULL, size INTEGER NOT NULL, completed_at REAL NOT NULL)"
+        )
+        if not resume:
+            self._db.execute("DELETE FROM cards")
+        self._db.commit()
+
+        # card_key -> (filename, size, content_hash) of every journaled card
+        self._done = {}
+        if resume:
+            for key, filename, size, content_hash in self._db.execute(
+                "SELECT card_key, filename, size, content_hash FROM cards"
+            ):
+                self._done[key] = (filename, size, content_hash)
+
+    def _is_current(self, key):
+        """Whether a card with this key was finished and its file is intact"""
+        done = self._done.get(key)
+        if done is None:
+            return False
+        filename, size, _ = done
+        try:
+            # A size mismatch catches files truncated by a crash after the journal commit
+            return os.path.getsize(os.path.join(self.output_path, filename)) == size
+        except OSError:
+            return False
+
+    def filter_rows(self, rows):
+        """Yield only the rows that still need rendering"""
+        for row in rows:
+            key = card_key(row, self.layout_key)
+            if self._is_current(key):
+                self.skipped += 1
+                filename, _, content_hash = self._done[key]
+                self._skipped_results.append((row[0], filename, content_hash))
+                continue
+            self._pending_keys[row[0]] = key
+            yield row
+
+    def drain_skipped(self):
+        """Pop the (card_number, filename, content_hash) of cards skipped since the last call"""
+        while self._skipped_results:
+            yield self._skipped_results.popleft()
+
+    def record(self, card_number, filename, content_hash):
+        """Journal a card that was written successfully"""
+        path = os.path.join(self.output_path, filename)
+        self._db.execute(
+            "INSERT OR REPLACE INTO cards VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                card_number,
+                filename,
+                self._pending_keys.pop(card_number),
+                content_hash,
+                os.path.getsize(path),
+                time.time()
+            )
+        )
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_every:
+            self.commit()
+
+    def forget(self, card_number):
+        """Drop a failed card so it is retried on the next run"""
+        self._pending_keys.pop(card_number, None)
+        self._db.execute("DELETE FROM cards WHERE card_number = ?", (card_number,))
+
+    def commit(self):
+        """Make journaled cards durable"""
+        self._db.commit()
+        self._uncommitted = 0
+
+    def close(self):
+        """Commit and close the journal"""
+        self.commit()
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,240 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import csv
+import hashlib
+import io
+import os
+import tarfile
+import threading
+import time
+import zipfile
+
+from pngstrips import StripEncoder
+from profiling import stage
+
+# --- Output Stage ---
+# Rendered cards are PNG-encoded and written on a small pool of threads so
+# zlib compression and disk I/O overlap with rendering the next cards. Cards
+# drawn on an opaque template are encoded in bands, compressing only the
+# bands where they differ from the template (see pngstrips.py).
+#
+# The sink decides where the PNGs go: "files" writes them side by side in the
+# output folder, "sharded" spreads them over numbered subfolders, and "zip" /
+# "tar" stream them into a single archive. Sharded and archive output also
+# write an index CSV mapping card numbers to files or archive entries.
+
+OUTPUT_SINKS = ("files", "sharded", "zip", "tar")
+ARCHIVE_SINKS = ("zip", "tar")
+ARCHIVE_BASENAME = "gift_cards"   # gift_cards.zip / .tar and gift_cards_index.csv
+INDEX_SUFFIX = "_index.csv"
+
+@dataclass(frozen=True)
+class OutputSettings:
+    """PNG encoding and writer pool settings for a batch"""
+    writer_threads: int = 2
+    queue_size: int = 16
+    compress_level: int = 6
+    optimize: bool = False
+    fast: bool = False
+    sink: str = "files"
+    shard_size: int = 1000  # Cards per subfolder for the "sharded" sink
+    strip_rows: int = 32    # Rows per independently compressed band, 0 to let Pillow encode whole cards
+
+    @classmethod
+    def from_config(cls, config):
+        """Build settings from the "output" section of config.json"""
+        output = config.get('output', {})
+        return cls(
+            writer_threads=int(output.get('writer_threads', 2)),
+            queue_size=int(output.get('queue_size', 16)),
+            compress_level=int(output.get('png_compress_level', 6)),
+            optimize=bool(output.get('png_optimize', False)),
+            fast=bool(output.get('fast_png', False)),
+            sink=str(output.get('sink', "files")).lower(),
+            shard_size=int(output.get('shard_size', 1000)),
+            strip_rows=int(output.get('png_strip_rows', 32))
+        )
+
+    def save_options(self):
+        """Keyword arguments for Image.save(..., "PNG")"""
+        if self.fast:
+            # Fastest zlib level: noticeably larger files, much cheaper encoding
+            return {"compress_level": 1}
+        return {"compress_level": self.compress_level, "optimize": self.optimize}
+
+def entry_name(settings, card_number, filename):
+    """Path of a card relative to the output folder, or its archive entry name"""
+    if settings.sink == "sharded":
+        return os.path.join(f"{(card_number - 1) // max(1, settings.shard_size):05d}", filename)
+    return filename
+
+def index_path(output_path):
+    """Where sharded and archive output keep their card index"""
+    return os.path.join(output_path, ARCHIVE_BASENAME + INDEX_SUFFIX)
+
+class CardEncoder:
+    """Turn renderer.RenderedCards into PNG bytes with a batch's settings.
+
+    Cards with a template go through a StripEncoder unless png_optimize asks
+    for the smallest files; the rest are saved by Pillow as a whole.
+    """
+
+    def __init__(self, settings=None):
+        self.settings = settings or OutputSettings()
+        self._save_options = self.settings.save_options()
+        self._strips = None
+        if self.settings.strip_rows > 0 and not self.settings.optimize:
+            self._strips = StripEncoder(self.settings.strip_rows, self._save_options["compress_level"])
+
+    def encode(self, card):
+        """PNG file bytes of a rendered card"""
+        if self._strips is not None and card.base is not None:
+            return self._strips.encode(card)
+        buffer = io.BytesIO()
+        card.image.save(buffer, "PNG", **self._save_options)
+        return buffer.getvalue()
+
+class PNGWriterPool:
+    """Write PNG files on a pool of threads fed through a bounded queue.
+
+    submit() blocks once queue_size writes are pending, which keeps memory
+    bounded when rendering outpaces the disk.
+    """
+
+    def __init__(self, settings=None):
+        self.settings = settings or OutputSettings()
+        self._encoder = CardEncoder(self.settings)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, self.settings.writer_threads),
+            thread_name_prefix="png-writer"
+        )
+        self._slots = threading.BoundedSemaphore(max(1, self.settings.queue_size))
+
+    def submit(self, card, path):
+        """Queue a RenderedCard to be written to path, returning a Future of the PNG's SHA-256"""
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._write, card, path)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _write(self, card, path):
+        """Encode and write one card, returning the SHA-256 hex digest of the file"""
+        with stage("save"):
+            data = self._encoder.encode(card)
+            if self.settings.sink == "sharded":
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write under a temporary name so a crash never leaves a truncated card behind
+            temp_path = path + ".tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+            return hashlib.sha256(data).hexdigest()
+
+    def close(self):
+        """Wait for pending writes and stop the writer threads"""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class PNGEncoderPool(PNGWriterPool):
+    """PNGWriterPool variant that only encodes, for archives written by the parent.
+
+    submit() resolves to (sha256 hex digest, PNG bytes); the path is ignored.
+    """
+
+    def _write(self, card, path):
+        with stage("save"):
+            data = self._encoder.encode(card)
+        return hashlib.sha256(data).hexdigest(), data
+
+class CardIndex:
+    """CSV index of card numbers and where each card ended up, written as cards arrive"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(["card_number", "entry", "sha256"])
+
+    def add(self, card_number, entry, content_hash):
+        self._writer.writerow([card_number, entry, content_hash or ""])
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class ArchiveSink:
+    """Append encoded cards to a ZIP or TAR archive in row order.
+
+    PNG data is already compressed, so ZIP entries are stored as is. TAR
+    output is written block by block without keeping member records, so
+    memory stays flat however many cards are added.
+    """
+
+    def __init__(self, settings, output_path):
+        self.kind = settings.sink
+        self.path = os.path.join(output_path, f"{ARCHIVE_BASENAME}.{self.kind}")
+        self.count = 0
+        self.index = CardIndex(index_path(output_path))
+        if self.kind == "zip":
+            self._zip = zipfile.ZipFile(self.path, 'w', compression=zipfile.ZIP_STORED, allowZip64=True)
+        else:
+            self._file = open(self.path, 'wb')
+
+    def add(self, card_number, filename, payload):
+        """Add one card's (sha256, PNG bytes), returning its "archive:entry" location"""
+        content_hash, data = payload
+        if self.kind == "zip":
+            info = zipfile.ZipInfo(filename, date_time=time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_STORED
+            self._zip.writestr(info, data)
+        else:
+            info = tarfile.TarInfo(filename)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            info.mode = 0o644
+            self._file.write(info.tobuf(tarfile.PAX_FORMAT))
+            self._file.write(data)
+            self._file.write(tarfile.NUL * (-len(data) % tarfile.BLOCKSIZE))
+        self.index.add(card_number, filename, content_hash)
+        self.count += 1
+        return f"{os.path.basename(self.path)}:{filename}"
+
+    def close(self):
+        """Finish the archive and the index"""
+        if self.kind == "zip":
+            self._zip.close()
+        else:
+            # End-of-archive marker, padded to a full record like tarfile does
+            self._file.write(tarfile.NUL * (2 * tarfile.BLOCKSIZE))
+            self._file.write(tarfile.NUL * (-self._file.tell() % tarfile.RECORDSIZE))
+            self._file.close()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def describe_output(stats, settings, output_path):
+    """Log lines saying where sharded or archive output and its index went"""
+    if "archive" in stats:
+        path, count = stats["archive"]
+        return [f"📦 Wrote {count} cards to {path}", f"🗂️ Card index written to {index_path(output_path)}"]
+    if settings.sink == "sharded":
+        return [f"🗂️ Cards sharded into subfolders of {settings.shard_size}; index written to {index_path(output_path)}"]
+    return []
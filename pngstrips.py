@@ -0,0 +1,122 @@
+from collections import OrderedDict
+import struct
+import threading
+import zlib
+
+from PIL import Image, ImageChops
+
+# --- Strip PNG Encoding ---
+# A card differs from the template it was drawn on only where its barcode and
+# values went, yet Image.save filters and deflates every row of it again. PNG
+# image data is a single zlib stream over filtered rows, so here the card is
+# cut into bands of strip_rows rows that are each deflated on their own and
+# ended with a full flush: a band starts on a byte boundary and never refers
+# back into an earlier one. The first row of a band is filtered against its
+# left neighbour only (Sub) and the others against the row above (Up), so a
+# band's bytes depend on nothing outside it either. The template's bands are
+# compressed once per batch; a card only filters and compresses the bands its
+# dirty boxes touch, and the file is stitched together from one IDAT chunk
+# per band with the Adler-32 checksum combined from the bands' checksums.
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+ADLER_BASE = 65521
+FILTER_SUB = 1
+FILTER_UP = 2
+STRIP_CACHE_ENTRIES = 8  # Templates with compressed bands kept per encoder
+
+def _chunk(tag, data):
+    """One PNG chunk: length, type, data and CRC"""
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(data, zlib.crc32(tag)))
+
+def adler32_combine(adler1, adler2, length2):
+    """Adler-32 of two byte strings joined, from their checksums (zlib's adler32_combine)"""
+    remainder = length2 % ADLER_BASE
+    sum1 = adler1 & 0xFFFF
+    sum2 = (remainder * sum1) % ADLER_BASE
+    sum1 = (sum1 + (adler2 & 0xFFFF) + ADLER_BASE - 1) % ADLER_BASE
+    sum2 = (sum2 + (adler1 >> 16) + (adler2 >> 16) + ADLER_BASE - remainder) % ADLER_BASE
+    return (sum2 << 16) | sum1
+
+def filter_band(band):
+    """PNG-filtered scanlines of an RGB band: Sub for its first row, Up for the rest.
+
+    The arithmetic runs in Pillow on the band viewed as one byte per pixel, so
+    a band costs a few image operations rather than a Python loop per byte.
+    """
+    width, height = band.size
+    stride = width * 3
+    raw = Image.frombytes("L", (stride, height), band.tobytes())
+    filtered = Image.new("L", (stride + 1, height), FILTER_UP)
+
+    if height > 1:
+        above = Image.new("L", (stride, height))
+        above.paste(raw.crop((0, 0, stride, height - 1)), (0, 1))
+        filtered.paste(ImageChops.subtract_modulo(raw, above), (1, 0))
+
+    first = raw.crop((0, 0, stride, 1))
+    if width > 1:
+        left = Image.new("L", (stride, 1))
+        left.paste(first.crop((0, 0, stride - 3, 1)), (3, 0))
+        first = ImageChops.subtract_modulo(first, left)
+    filtered.paste(first, (1, 0))
+    filtered.putpixel((0, 0), FILTER_SUB)
+    return filtered.tobytes()
+
+class StripEncoder:
+    """PNG encoder for RGB cards that reuses the compressed bands of their templates.
+
+    encode() takes a renderer.RenderedCard with a base. Thread-safe: the
+    writer threads of a pool share one encoder and its template bands.
+    """
+
+    def __init__(self, strip_rows=32, compress_level=6):
+        self.strip_rows = max(1, strip_rows)
+        self.compress_level = compress_level
+        self._templates = OrderedDict()  # base_key -> [(IDAT chunk, adler32, length)] per band
+        self._lock = threading.Lock()
+
+    def _encode_band(self, image, index):
+        """Filter and deflate one band of an image into (IDAT chunk, adler32, length)"""
+        top = index * self.strip_rows
+        bottom = min(top + self.strip_rows, image.height)
+        data = filter_band(image.crop((0, top, image.width, bottom)))
+        compressor = zlib.compressobj(self.compress_level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        deflated = compressor.compress(data) + compressor.flush(zlib.Z_FULL_FLUSH)
+        return _chunk(b"IDAT", deflated), zlib.adler32(data), len(data)
+
+    def _template_bands(self, key, base):
+        """Compressed bands of a template, encoded on first use"""
+        with self._lock:
+            bands = self._templates.get(key)
+            if bands is not None:
+                self._templates.move_to_end(key)
+                return bands
+        bands = [self._encode_band(base, index) for index in range(-(-base.height // self.strip_rows))]
+        with self._lock:
+            self._templates[key] = bands
+            while len(self._templates) > STRIP_CACHE_ENTRIES:
+                self._templates.popitem(last=False)
+        return bands
+
+    def encode(self, card):
+        """PNG file bytes of a card, compressing only the bands its dirty boxes touch"""
+        image = card.image
+        bands = list(self._template_bands(card.base_key, card.base))
+        dirty = set()
+        for _, top, _, bottom in card.dirty:
+            top, bottom = max(0, top), min(bottom, image.height)
+            if bottom > top:
+                dirty.update(range(top // self.strip_rows, (bottom - 1) // self.strip_rows + 1))
+        for index in sorted(dirty):
+            bands[index] = self._encode_band(image, index)
+
+        header = struct.pack(">IIBBBBB", image.width, image.height, 8, 2, 0, 0, 0)  # 8-bit RGB
+        adler = 1
+        parts = [PNG_SIGNATURE, _chunk(b"IHDR", header), _chunk(b"IDAT", b"\x78\x9c")]  # zlib header
+        for chunk, band_adler, length in bands:
+            parts.append(chunk)
+            adler = adler32_combine(adler, band_adler, length)
+        # An empty final deflate block and the Adler-32 of all the scanlines close the stream
+        parts.append(_chunk(b"IDAT", b"\x03\x00" + struct.pack(">I", adler)))
+        parts.append(_chunk(b"IEND", b""))
+        return b"".join(parts)
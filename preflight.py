@@ -0,0 +1,147 @@
+from dataclasses import dataclass, replace
+import math
+import time
+
+import pandas as pd
+
+from datasource import load_column
+
+# --- Barcode Preflight ---
+# Before a batch starts, the whole barcode column is read once and checked
+# with pandas string operations instead of card by card: every payload is
+# wrapped exactly as renderer.format_barcode_data does it, then checked for
+# characters Code128 can't encode, payloads shared by several cards and
+# lengths that stand out from the rest of the file. Problems are reported all
+# at once, up front, instead of as scattered card failures mid-batch.
+
+# Code128 code sets A and B together cover ASCII 0-127
+CODE128_PATTERN = r"[\x00-\x7f]*"
+NON_CODE128_PATTERN = r"[\x00-\x7f]"  # Removing these leaves the offending characters
+
+@dataclass(frozen=True)
+class PreflightSettings:
+    """Barcode preflight options for a batch"""
+    enabled: bool = True
+    strict: bool = False       # Refuse to render when any barcode is invalid or duplicated
+    max_listed: int = 10       # Rows listed per problem in the log
+    outlier_iqr: float = 1.5   # Length outlier fence in interquartile ranges, 0 to skip
+
+    @classmethod
+    def from_config(cls, config):
+        """Build settings from the "preflight" section of config.json"""
+        preflight = config.get('preflight', {})
+        return cls(
+            enabled=bool(preflight.get('enabled', True)),
+            strict=bool(preflight.get('strict', False)),
+            max_listed=int(preflight.get('max_listed', 10)),
+            outlier_iqr=float(preflight.get('outlier_iqr', 1.5))
+        )
+
+@dataclass(frozen=True)
+class PreflightReport:
+    """Problems found in a barcode column, each keyed by card number"""
+    checked: int
+    invalid: pd.Series     # card number -> reason
+    duplicates: pd.Series  # wrapped payload -> list of card numbers
+    outliers: pd.Series    # card number -> payload length
+    expected_lengths: tuple  # (shortest, longest) length that isn't an outlier, or None
+    seconds: float
+
+    @property
+    def has_errors(self):
+        """Whether any barcode can't be encoded or is shared by several cards"""
+        return bool(len(self.invalid) or len(self.duplicates))
+
+def format_barcode_column(values):
+    """Wrap every payload in the ;...? sentinels, like format_barcode_data does for one"""
+    text = values.astype(str)
+    opened = text.str.startswith(';')
+    closed = text.str.endswith('?')
+    wrapped = text.where(opened, ';' + text + '?')
+    return wrapped.where(~opened | closed, text + '?')
+
+def _length_outliers(lengths, fence):
+    """Tukey fences on payload lengths, returning (outlier lengths, expected range)"""
+    if fence <= 0 or lengths.empty:
+        return lengths.iloc[:0], None
+    q1, q3 = lengths.quantile([0.25, 0.75])
+    spread = q3 - q1
+    low = max(0, math.ceil(q1 - fence * spread))
+    high = math.floor(q3 + fence * spread)
+    return lengths[(lengths < low) | (lengths > high)], (low, high)
+
+def check_barcodes(values, outlier_iqr=1.5):
+    """Check a Series of raw barcode values indexed by card number"""
+    start = time.perf_counter()
+    values = values.astype(str)
+    wrapped = format_barcode_column(values)
+
+    empty = values.str.len() == 0
+    illegal = ~wrapped.str.fullmatch(CODE128_PATTERN)
+    bad_characters = wrapped[illegal].str.replace(NON_CODE128_PATTERN, "", regex=True)
+    invalid = pd.concat([
+        bad_characters.map(lambda chars: "characters Code128 can't encode: " + " ".join(repr(c) for c in dict.fromkeys(chars))),
+        pd.Series("empty barcode", index=values.index[empty & ~illegal], dtype=object)
+    ]).sort_index()
+
+    # Compare wrapped payloads: "123" and ";123?" print the same barcode
+    valid = wrapped[~(empty | illegal)]
+    shared = valid[valid.duplicated(keep=False)]
+    duplicates = shared.index.to_series().groupby(shared.to_numpy(), sort=False).agg(list)
+
+    outliers, expected = _length_outliers(values[~(empty | illegal)].str.len(), outlier_iqr)
+    return PreflightReport(
+        checked=len(values),
+        invalid=invalid,
+        duplicates=duplicates,
+        outliers=outliers,
+        expected_lengths=expected,
+        seconds=time.perf_counter() - start
+    )
+
+def preflight_data_file(data_path, barcode_col, settings):
+    """Read the barcode column of a data file and check it"""
+    start = time.perf_counter()
+    report = check_barcodes(load_column(data_path, barcode_col), settings.outlier_iqr)
+    # Report the file read as part of the pass; it is most of the cost
+    return replace(report, seconds=time.perf_counter() - start)
+
+def _listed(lines, count, max_listed):
+    """Indent up to max_listed detail lines and note how many were left out"""
+    shown = ["   " + line for line in lines[:max_listed]]
+    if count > max_listed:
+        shown.append(f"   ... and {count - max_listed} more")
+    return shown
+
+def describe_preflight(report, max_listed=10):
+    """Readable log lines for a preflight report"""
+    lines = []
+    if len(report.invalid):
+        lines.append(f"❌ {len(report.invalid)} barcodes can't be printed:")
+        lines.extend(_listed(
+            [f"card {card}: {reason}" for card, reason in report.invalid.head(max_listed).items()],
+            len(report.invalid), max_listed
+        ))
+    if len(report.duplicates):
+        cards = sum(len(numbers) for numbers in report.duplicates)
+        lines.append(f"⚠️ {len(report.duplicates)} barcodes are shared by {cards} cards:")
+        lines.extend(_listed(
+            [
+                f"{payload} on cards {', '.join(str(card) for card in numbers[:max_listed])}"
+                + (", ..." if len(numbers) > max_listed else "")
+                for payload, numbers in report.duplicates.head(max_listed).items()
+            ],
+            len(report.duplicates), max_listed
+        ))
+    if len(report.outliers):
+        low, high = report.expected_lengths
+        expected = f"{low}" if low == high else f"{low}-{high}"
+        lines.append(f"⚠️ {len(report.outliers)} barcodes have unusual lengths (most are {expected} characters):")
+        lines.extend(_listed(
+            [f"card {card}: {length} characters" for card, length in report.outliers.head(max_listed).items()],
+            len(report.outliers), max_listed
+        ))
+    if not lines:
+        lines.append(f"✅ Barcode preflight passed for {report.checked} cards")
+    lines.append(f"🔎 Preflight checked {report.checked} barcodes in {report.seconds:.2f}s")
+    return lines
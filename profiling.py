@@ -0,0 +1,237 @@
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+import cProfile
+import csv
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+
+# --- Stage Profiling ---
+# Rendering code wraps its steps in `with stage("name"):`. That is a no-op
+# until a StageProfiler is installed in the process, so batches only pay for
+# timing when profiling is switched on. Each process keeps its own profiler;
+# batch.render_batch collects their snapshots and merges them.
+
+PROFILE_BASENAME = "render_profile"  # Trace and cProfile files in the output folder
+TRACE_FORMATS = ("json", "csv")
+
+# Histogram bucket upper bounds in milliseconds; a final bucket counts anything slower
+HISTOGRAM_BOUNDS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+@dataclass(frozen=True)
+class ProfileSettings:
+    """Profiling options for a batch"""
+    enabled: bool = False
+    trace_format: str = "json"
+    cprofile_cards: int = 0  # Cards per process to capture with cProfile, 0 to skip
+
+    @classmethod
+    def from_config(cls, config):
+        """Build settings from the "profiling" section of config.json"""
+        profiling = config.get('profiling', {})
+        return cls(
+            enabled=bool(profiling.get('enabled', False)),
+            trace_format=str(profiling.get('trace_format', "json")).lower(),
+            cprofile_cards=int(profiling.get('cprofile_cards', 0))
+        )
+
+def peak_memory_bytes():
+    """Peak resident memory of this process, or None where it can't be read"""
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+class StageProfiler:
+    """Thread-safe per-stage call counts, totals and latency histograms"""
+
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        """Add one timed call of a stage"""
+        ms = seconds * 1000
+        bucket = next((i for i, bound in enumerate(HISTOGRAM_BOUNDS_MS) if ms <= bound), len(HISTOGRAM_BOUNDS_MS))
+        with self._lock:
+            stats = self._stages.get(name)
+            if stats is None:
+                stats = self._stages[name] = {
+                    "count": 0,
+                    "total_s": 0.0,
+                    "max_ms": 0.0,
+                    "histogram": [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+                }
+            stats["count"] += 1
+            stats["total_s"] += seconds
+            stats["max_ms"] = max(stats["max_ms"], ms)
+            stats["histogram"][bucket] += 1
+
+    @contextmanager
+    def timed(self, name):
+        """Time the body of a with block as one call of a stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        """Return a picklable copy of the counters plus this process's peak memory"""
+        with self._lock:
+            stages = {
+                name: dict(stats, histogram=list(stats["histogram"]))
+                for name, stats in self._stages.items()
+            }
+        return {"stages": stages, "peak_rss_bytes": {str(os.getpid()): peak_memory_bytes()}}
+
+_active_profiler = None
+
+def install_profiler(profiler):
+    """Make profiler receive this process's stage timings (None to switch off)"""
+    global _active_profiler
+    _active_profiler = profiler
+
+def stage(name):
+    """Context manager timing a rendering stage when a profiler is installed"""
+    profiler = _active_profiler
+    if profiler is None:
+        return nullcontext()
+    return profiler.timed(name)
+
+def merge_snapshots(snapshots):
+    """Combine profiler snapshots from several processes"""
+    merged = {"stages": {}, "peak_rss_bytes": {}}
+    for snapshot in snapshots:
+        merged["peak_rss_bytes"].update(snapshot["peak_rss_bytes"])
+        for name, stats in snapshot["stages"].items():
+            total = merged["stages"].get(name)
+            if total is None:
+                merged["stages"][name] = dict(stats, histogram=list(stats["histogram"]))
+                continue
+            total["count"] += stats["count"]
+            total["total_s"] += stats["total_s"]
+            total["max_ms"] = max(total["max_ms"], stats["max_ms"])
+            total["histogram"] = [a + b for a, b in zip(total["histogram"], stats["histogram"])]
+    return merged
+
+def histogram_percentile_ms(stats, fraction):
+    """Upper bound of the histogram bucket holding the given fraction of calls"""
+    target = stats["count"] * fraction
+    seen = 0
+    for bound, count in zip(HISTOGRAM_BOUNDS_MS, stats["histogram"]):
+        seen += count
+        if count and seen >= target:
+            return min(bound, stats["max_ms"])
+    return stats["max_ms"]
+
+class CardSampler:
+    """Run the first N cards of a process under cProfile and dump the stats to a file"""
+
+    def __init__(self, cards, path):
+        self.remaining = cards
+        self.path = path
+        self._profile = cProfile.Profile()
+        self._captured = False
+
+    def run(self, func, *args):
+        """Call func, profiling it while the sample isn't full yet"""
+        if self.remaining <= 0:
+            return func(*args)
+        self.remaining -= 1
+        self._captured = True
+        return self._profile.runcall(func, *args)
+
+    def flush(self):
+        """Write the captured stats, if anything new was profiled"""
+        if self._captured:
+            self._profile.dump_stats(self.path)
+            self._captured = False
+
+def cprofile_part_path(output_path):
+    """Per-process cProfile dump path, merged by report_profile"""
+    return os.path.join(output_path, f"{PROFILE_BASENAME}.{os.getpid()}.prof")
+
+def _merge_cprofile(output_path):
+    """Merge per-process cProfile dumps into one file, returning (path, top functions text)"""
+    prefix = PROFILE_BASENAME + "."
+    parts = [
+        os.path.join(output_path, name) for name in sorted(os.listdir(output_path))
+        if name.startswith(prefix) and name.endswith(".prof") and name[len(prefix):-5].isdigit()
+    ]
+    if not parts:
+        return None, ""
+    stream = io.StringIO()
+    stats = pstats.Stats(*parts, stream=stream)
+    merged_path = os.path.join(output_path, PROFILE_BASENAME + ".prof")
+    stats.dump_stats(merged_path)
+    for part in parts:
+        os.remove(part)
+    stats.sort_stats("cumulative").print_stats(15)
+    return merged_path, stream.getvalue()
+
+def write_trace(snapshot, path, trace_format="json"):
+    """Write a merged snapshot as a JSON document or a CSV table of stages"""
+    if trace_format == "csv":
+        bucket_names = [f"le_{bound}ms" for bound in HISTOGRAM_BOUNDS_MS] + [f"gt_{HISTOGRAM_BOUNDS_MS[-1]}ms"]
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["stage", "count", "total_s", "mean_ms", "p50_ms", "p95_ms", "max_ms"] + bucket_names)
+            for name, stats in snapshot["stages"].items():
+                writer.writerow([
+                    name,
+                    stats["count"],
+                    f"{stats['total_s']:.6f}",
+                    f"{stats['total_s'] / stats['count'] * 1000:.4f}",
+                    histogram_percentile_ms(stats, 0.5),
+                    histogram_percentile_ms(stats, 0.95),
+                    f"{stats['max_ms']:.4f}"
+                ] + stats["histogram"])
+        return
+    document = dict(snapshot, histogram_bounds_ms=list(HISTOGRAM_BOUNDS_MS))
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+
+def summary_lines(snapshot):
+    """Readable per-stage summary lines for the log"""
+    stages = snapshot["stages"]
+    grand_total = sum(stats["total_s"] for stats in stages.values()) or 1.0
+    lines = []
+    for name, stats in sorted(stages.items(), key=lambda item: -item[1]["total_s"]):
+        mean_ms = stats["total_s"] / stats["count"] * 1000
+        lines.append(
+            f"⏱️ {name}: {stats['count']} calls, mean {mean_ms:.2f} ms, "
+            f"p95 ≤ {histogram_percentile_ms(stats, 0.95):g} ms, max {stats['max_ms']:.1f} ms, "
+            f"{stats['total_s']:.2f} s ({stats['total_s'] / grand_total * 100:.0f}%)"
+        )
+    peaks = [peak for peak in snapshot["peak_rss_bytes"].values() if peak]
+    if peaks:
+        lines.append(f"🧠 Peak memory: {max(peaks) / 1e6:.0f} MB per process (highest of {len(peaks)})")
+    return lines
+
+def report_profile(stats, output_path, settings):
+    """Write the trace and cProfile files for a finished batch, returning log lines"""
+    lines = []
+    snapshot = stats.get("profile")
+    if snapshot and snapshot["stages"]:
+        lines.extend(summary_lines(snapshot))
+        trace_format = settings.trace_format if settings.trace_format in TRACE_FORMATS else "json"
+        trace_path = os.path.join(output_path, f"{PROFILE_BASENAME}.{trace_format}")
+        write_trace(snapshot, trace_path, trace_format)
+        lines.append(f"📄 Profile trace written to {trace_path}")
+    if settings.cprofile_cards > 0:
+        merged_path, top = _merge_cprofile(output_path)
+        if merged_path:
+            lines.append(f"📄 cProfile sample written to {merged_path}")
+            # Skip the pstats preamble (dump file names and dates) down to the table
+            table = top[top.find("ncalls"):] if "ncalls" in top else top
+            lines.extend(line for line in table.splitlines() if line.strip())
+    return lines
@@ -0,0 +1,611 @@
+from PIL import Image, ImageDraw
+from barcode import Code128
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+import os
+import re
+import threading
+
+from fonts import get_font
+from glyphs import glyph_cache
+from profiling import stage
+
+# --- Layout Snapshot ---
+BARCODE_SIZES = {
+    "Small": (300, 80),
+    "Medium": (400, 100),
+    "Large": (500, 120),
+    "XL": (600, 140)
+}
+
+@dataclass(frozen=True)
+class CardLayout:
+    """Frozen snapshot of the layout settings used to render gift cards"""
+    barcode_x: float = 85.0
+    barcode_y: float = 85.0
+    barcode_width: int = 400
+    barcode_height: int = 100
+    text_position: str = "Bottom-Left"
+    text_x: float = 10.0
+    text_y: float = 90.0
+    text_alignment: str = "Left"
+    text_background: str = "White Box"
+    text_scale: float = 100.0
+    custom_bg_color: str = "#E0E0E0"
+    font_family: str = "Arial"
+    base_font_size: int = 18
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a layout from a plain dict such as a parsed layout.json.
+
+        A "barcode_size" preset name may be given instead of an explicit
+        barcode_width/barcode_height pair.
+        """
+        data = dict(data)
+        size_name = data.pop("barcode_size", None)
+        if size_name is not None:
+            if size_name not in BARCODE_SIZES:
+                raise ValueError(f"Unknown barcode size: {size_name}")
+            data.setdefault("barcode_width", BARCODE_SIZES[size_name][0])
+            data.setdefault("barcode_height", BARCODE_SIZES[size_name][1])
+
+        field_types = {f.name: f.type for f in fields(cls)}
+        unknown = sorted(set(data) - set(field_types))
+        if unknown:
+            raise ValueError(f"Unknown layout settings: {', '.join(unknown)}")
+
+        # Coerce values so "85" from a hand-written file behaves like 85.0
+        return cls(**{key: field_types[key](value) for key, value in data.items()})
+
+# --- Background Template Cache ---
+BACKGROUND_CACHE_SIZE = 4
+_background_cache = {}
+_base_cache = {}
+_proxy_cache = {}
+_background_cache_lock = threading.Lock()
+
+def _template_key(background_path):
+    """Cache key that changes whenever the background file is edited"""
+    stat = os.stat(background_path)
+    return os.path.abspath(background_path), stat.st_mtime_ns, stat.st_size
+
+def _cache_lookup(cache, key):
+    with _background_cache_lock:
+        return cache.get(key)
+
+def _cache_store(cache, key, image):
+    with _background_cache_lock:
+        cache[key] = image
+        # Drop the oldest images once the cache is full
+        while len(cache) > BACKGROUND_CACHE_SIZE:
+            del cache[next(iter(cache))]
+
+def _load_background_entry(background_path):
+    """Cached (image, whether every pixel is opaque) of a background file.
+
+    Opaque backgrounds are kept only flattened to RGB, which is all that
+    rendering them needs; the others are kept as RGBA.
+    """
+    key = _template_key(background_path)
+    entry = _cache_lookup(_background_cache, key)
+    if entry is None:
+        with Image.open(background_path) as img:
+            template = img.convert("RGBA")
+        # Scanning the alpha channel is as costly as a big resize, so do it once per file
+        opaque = template.getextrema()[3][0] == 255
+        # Holding both modes of a large background would cost every worker process twice the memory
+        entry = (template.convert("RGB") if opaque else template, opaque)
+        _cache_store(_background_cache, key, entry)
+    return entry
+
+def load_background_template(background_path):
+    """Load a background image as RGBA, decoding each file only once.
+
+    Entries are keyed by path, modification time and file size so an edited
+    template is picked up again. Opaque backgrounds are cached as RGB and
+    converted on every call, as cards never need them as RGBA. Callers must
+    copy() the returned image before drawing on it.
+    """
+    image, opaque = _load_background_entry(background_path)
+    return image.convert("RGBA") if opaque else image
+
+def background_is_opaque(background_path):
+    """Whether a background has no transparent pixels, cached with its template"""
+    return _load_background_entry(background_path)[1]
+
+def background_size(background_path):
+    """(width, height) of a background, from its cached template"""
+    return _load_background_entry(background_path)[0].size
+
+def load_background_base(background_path):
+    """Return the background template flattened to RGB, cached like the template"""
+    image, opaque = _load_background_entry(background_path)
+    if opaque:
+        return image
+    key = _template_key(background_path)
+    base = _cache_lookup(_base_cache, key)
+    if base is None:
+        base = image.convert("RGB")
+        _cache_store(_base_cache, key, base)
+    return base
+
+def load_background_proxy(background_path, size):
+    """Return the background template downscaled to size, cached like the template"""
+    key = _template_key(background_path) + (tuple(size),)
+    proxy = _cache_lookup(_proxy_cache, key)
+    if proxy is None:
+        image = _load_background_entry(background_path)[0]
+        # Fully opaque pixels resize the same in RGB, so only the small result is converted
+        proxy = image.resize(tuple(size), Image.Resampling.LANCZOS).convert("RGBA")
+        _cache_store(_proxy_cache, key, proxy)
+    return proxy
+
+# --- Barcode Rasterization ---
+# Geometry of the Code128 images previously produced by python-barcode's
+# ImageWriter. Its write() call replaced our writer options with the Code128
+# defaults, so these are the sizes existing layouts were designed against.
+BARCODE_MODULE_MM = 0.2
+BARCODE_QUIET_ZONE_MM = 2.54
+BARCODE_BAR_HEIGHT_MM = 15.0
+BARCODE_MARGIN_MM = 1.0
+BARCODE_DPI = 300
+
+def format_barcode_data(barcode_data):
+    """Wrap barcode data in the ;...? sentinels expected by our POS scanners"""
+    # If barcode_data doesn't have semicolon/question mark, format it properly
+    formatted_data = str(barcode_data)
+    if not formatted_data.startswith(';'):
+        formatted_data = f';{formatted_data}?'
+    elif not formatted_data.endswith('?'):
+        formatted_data = f'{formatted_data}?'
+    return formatted_data
+
+def encode_code128(formatted_data):
+    """Encode data as a Code128 module pattern string of '1' (bar) and '0' (space)"""
+    return Code128(formatted_data).build()[0]
+
+def barcode_image_size(module_count, target_width, target_height):
+    """Pixel size of a barcode with module_count modules fitted into the target box"""
+    mm_to_px = BARCODE_DPI / 25.4
+    width = int((2 * BARCODE_QUIET_ZONE_MM + module_count * BARCODE_MODULE_MM) * mm_to_px)
+    height = int((2 * BARCODE_MARGIN_MM + BARCODE_BAR_HEIGHT_MM) * mm_to_px)
+
+    # Calculate scale to fit target dimensions
+    scale_x = target_width / width
+    scale_y = target_height / height
+    scale = min(scale_x, scale_y)  # Maintain aspect ratio
+
+    return int(width * scale), int(height * scale)
+
+def code128_bars(modules, width, height):
+    """Bars of a module pattern in a width x height barcode as (left, top, right, bottom) boxes.
+
+    Every module gets the same whole number of pixels and the leftover width
+    goes to the quiet zones, so bar edges stay sharp without resampling. If
+    the barcode is narrower than one pixel per module, bar edges are rounded
+    to the nearest pixel instead. Far edges are exclusive.
+    """
+    module_count = len(modules)
+    total_mm = 2 * BARCODE_QUIET_ZONE_MM + module_count * BARCODE_MODULE_MM
+    quiet_zone = round(width * BARCODE_QUIET_ZONE_MM / total_mm)
+
+    module_px = (width - 2 * quiet_zone) // module_count
+    symbol_width = module_px * module_count if module_px >= 1 else width - 2 * quiet_zone
+    left = (width - symbol_width) // 2
+
+    top = round(height * BARCODE_MARGIN_MM / (2 * BARCODE_MARGIN_MM + BARCODE_BAR_HEIGHT_MM))
+    bottom = height - top
+
+    bars = []
+    for bar in re.finditer('1+', modules):
+        x1 = left + bar.start() * symbol_width // module_count
+        x2 = left + bar.end() * symbol_width // module_count
+        if x2 > x1:
+            bars.append((x1, top, x2, bottom))
+    return bars
+
+def rasterize_code128(modules, width, height):
+    """Draw a module pattern as crisp black bars on a white L-mode image"""
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    for x1, top, x2, bottom in code128_bars(modules, width, height):
+        draw.rectangle([x1, top, x2 - 1, bottom - 1], fill=0)
+    return image
+
+# --- Barcode Cache ---
+BARCODE_CACHE_ENTRIES = 1024
+BARCODE_CACHE_BYTES = 64 * 1024 * 1024
+
+class ImageCache:
+    """LRU cache of finished images, bounded by entry count and total bytes"""
+
+    def __init__(self, max_entries=BARCODE_CACHE_ENTRIES, max_bytes=BARCODE_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached image for key, or None, counting the hit or miss"""
+        with self._lock:
+            image = self._images.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._images.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def put(self, key, image):
+        """Store an image, evicting the least recently used entries to stay in bounds"""
+        size = image.width * image.height * len(image.getbands())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._images.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.width * previous.height * len(previous.getbands())
+            self._images[key] = image
+            self._bytes += size
+            while len(self._images) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self._bytes -= evicted.width * evicted.height * len(evicted.getbands())
+
+    def counters(self):
+        """Return (hits, misses) since the counters were last reset"""
+        with self._lock:
+            return self.hits, self.misses
+
+    def reset_counters(self):
+        """Zero the hit and miss counters, keeping the cached images"""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def clear(self):
+        """Drop every cached image and zero the counters"""
+        with self._lock:
+            self._images.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+barcode_cache = ImageCache()
+
+def generate_barcode(barcode_data, target_width, target_height):
+    """Generate POS scanner-compatible Code128 barcode at the target size.
+
+    Images are shared through barcode_cache and must not be modified.
+    """
+    formatted_data = format_barcode_data(barcode_data)
+    key = (formatted_data, target_width, target_height)
+    barcode_img = barcode_cache.get(key)
+    if barcode_img is None:
+        modules = encode_code128(formatted_data)
+        width, height = barcode_image_size(len(modules), target_width, target_height)
+        barcode_img = rasterize_code128(modules, width, height)
+        barcode_cache.put(key, barcode_img)
+    return barcode_img
+
+# --- Compiled Layout ---
+TEXT_PADDING = 10      # Padding between the text and its background box
+TEXT_MARGIN = 15       # Margin from the card edges for preset text positions
+TEXT_LINE_SPACING = 5  # Vertical gap between text lines
+
+# Preset text positions as (horizontal, vertical) placement of the text block
+TEXT_PRESETS = {
+    "Top-Left": ("start", "start"),
+    "Top-Right": ("end", "start"),
+    "Bottom-Left": ("start", "end"),
+    "Bottom-Right": ("end", "end"),
+    "Center": ("center", "center")
+}
+
+def parse_hex_color(color, default=(224, 224, 224)):
+    """Parse a #RRGGBB color into an (r, g, b) tuple, or return default"""
+    try:
+        if color.startswith('#'):
+            color = color[1:]
+        return int(color[0:2], 16), int(color[2:4], 16), int(color[4:6], 16)
+    except (AttributeError, ValueError):
+        return default
+
+@dataclass(frozen=True)
+class CompiledLayout:
+    """Batch-invariant geometry and styling for one CardLayout on one background.
+
+    Built once per batch (and once per worker process) by compile_layout, so
+    per-card work is limited to measuring the text and placing the pieces.
+    """
+    layout: CardLayout
+    background_path: str
+    size: tuple
+    barcode_center: tuple
+    text_anchor: tuple
+    text_placement: tuple
+    font: object
+    font_size: int
+    box_fill: object
+    text_color: tuple
+    opaque_background: bool
+
+    def barcode_origin(self, barcode_width, barcode_height):
+        """Top-left corner of a barcode image, kept within the card"""
+        bg_width, bg_height = self.size
+        barcode_x = self.barcode_center[0] - barcode_width // 2
+        barcode_y = self.barcode_center[1] - barcode_height // 2
+        barcode_x = max(0, min(barcode_x, bg_width - barcode_width))
+        barcode_y = max(0, min(barcode_y, bg_height - barcode_height))
+        return barcode_x, barcode_y
+
+    def text_origin(self, text_width, text_height):
+        """Top-left corner of the text itself (inside the padded box)"""
+        img_width, img_height = self.size
+        block_width = text_width + 2 * TEXT_PADDING
+        block_height = text_height + 2 * TEXT_PADDING
+
+        if self.text_placement is None:
+            # Custom positions are percentages of the card, kept within bounds
+            text_x, text_y = self.text_anchor
+            if self.layout.text_alignment == "Center":
+                text_x -= text_width // 2
+            elif self.layout.text_alignment == "Right":
+                text_x -= text_width
+            text_y -= text_height // 2
+
+            text_x = max(TEXT_PADDING, min(text_x, img_width - block_width))
+            text_y = max(TEXT_PADDING, min(text_y, img_height - block_height))
+            return text_x, text_y
+
+        def place(mode, available, block):
+            if mode == "start":
+                return TEXT_MARGIN
+            if mode == "end":
+                return available - block - TEXT_MARGIN
+            return (available - block) // 2
+
+        horizontal, vertical = self.text_placement
+        return (
+            place(horizontal, img_width, block_width) + TEXT_PADDING,
+            place(vertical, img_height, block_height) + TEXT_PADDING
+        )
+
+    def line_offset(self, max_width, line_width):
+        """Horizontal offset of a line within the text block for the alignment"""
+        if self.layout.text_alignment == "Center":
+            return (max_width - line_width) // 2
+        if self.layout.text_alignment == "Right":
+            return max_width - line_width
+        return 0
+
+def compile_layout(layout, background_path):
+    """Resolve a CardLayout against a background into a CompiledLayout"""
+    bg_width, bg_height = background_size(background_path)
+
+    if layout.text_position == "Custom":
+        text_placement = None
+    else:
+        # Fallback to bottom-left if position is unrecognized
+        text_placement = TEXT_PRESETS.get(layout.text_position, TEXT_PRESETS["Bottom-Left"])
+
+    if layout.text_background == "White Box":
+        box_fill = (255, 255, 255, 255)
+    elif layout.text_background == "Custom Color":
+        box_fill = parse_hex_color(layout.custom_bg_color) + (255,)
+    else:
+        box_fill = None
+
+    # Fonts are resolved once per process and shared per size; FreeType
+    # rejects a size of 0, so tiny text scales still get 1 px text
+    font_size = max(1, int(layout.base_font_size * (layout.text_scale / 100)))
+
+    return CompiledLayout(
+        layout=layout,
+        background_path=background_path,
+        size=(bg_width, bg_height),
+        barcode_center=(int((layout.barcode_x / 100) * bg_width), int((layout.barcode_y / 100) * bg_height)),
+        text_anchor=(int((layout.text_x / 100) * bg_width), int((layout.text_y / 100) * bg_height)),
+        text_placement=text_placement,
+        font=get_font(layout.font_family, font_size),
+        font_size=font_size,
+        box_fill=box_fill,
+        text_color=(0, 0, 0) if layout.text_background == "White Box" else (255, 255, 255),
+        opaque_background=background_is_opaque(background_path)
+    )
+
+# --- Card Rendering ---
+# Fixed part of each text line; only the values after them change per card
+TEXT_LABELS = ("Card: ", "Card Number: ", "PIN: ")
+
+@dataclass(frozen=True)
+class TextBlock:
+    """Positioned card text in card pixels: (x, y, text) lines, their glyph runs and the padded box"""
+    lines: tuple
+    runs: tuple
+    box: tuple
+
+def card_filename(member_number, card_number):
+    """Output file name for a rendered gift card"""
+    return f"gift_card_{member_number}_{card_number:04d}.png"
+
+def layout_text_block(compiled, member_number, verification_code, card_number=1):
+    """Measure the card text and place it according to the compiled layout"""
+    # Assemble each line from the cached label and glyphs; measuring is free after that
+    glyphs = glyph_cache(compiled.font)
+    values = (card_number, member_number, verification_code)
+    runs = [glyphs.labelled(label, str(value)) for label, value in zip(TEXT_LABELS, values)]
+    text_lines = [run.text for run in runs]
+
+    # Calculate text dimensions
+    text_widths = [run.bbox[2] - run.bbox[0] for run in runs]
+    text_heights = [run.bbox[3] - run.bbox[1] for run in runs]
+
+    max_text_width = max(text_widths)
+    total_text_height = sum(text_heights) + (len(text_lines) - 1) * TEXT_LINE_SPACING
+
+    text_x, text_y = compiled.text_origin(max_text_width, total_text_height)
+
+    positioned = []
+    current_y = text_y
+    for i, line in enumerate(text_lines):
+        positioned.append((text_x + compiled.line_offset(max_text_width, text_widths[i]), current_y, line))
+        current_y += text_heights[i] + TEXT_LINE_SPACING
+
+    box = (
+        text_x - TEXT_PADDING,
+        text_y - TEXT_PADDING,
+        text_x + max_text_width + TEXT_PADDING,
+        text_y + total_text_height + TEXT_PADDING
+    )
+    return TextBlock(lines=tuple(positioned), runs=tuple(runs), box=box)
+
+def _draw_text_block(draw, compiled, block):
+    """Draw a text block: its background box, then every line's label and value pieces"""
+    if compiled.box_fill is not None:
+        draw.rectangle(list(block.box), fill=compiled.box_fill)
+    # Same pixels as draw.text, without laying out and rasterizing the line again
+    for (line_x, line_y, _), run in zip(block.lines, block.runs):
+        for (x, y), mask in run.static + run.variable:
+            draw.bitmap((line_x + x, line_y + y), mask, fill=compiled.text_color)
+
+# --- Card Templates ---
+# Apart from the barcode and the text block, every card of a batch is the
+# same. For opaque backgrounds the template is flattened to RGB once, and a
+# card copies it, pastes its barcode and draws its text, with no per-card mode
+# conversion. The text box and labels are drawn per card too: their size and
+# position follow the widths of the values, so pre-compositing them would
+# need a base per value width, which with alphanumeric codes is nearly one
+# per card. Backgrounds with transparency keep the RGBA path: text blends
+# differently over translucent pixels. The finished card carries its base and
+# the boxes it drew into, so the PNG writer only has to compress those rows
+# again (see pngstrips.py).
+
+@dataclass(frozen=True)
+class RenderedCard:
+    """A finished card and the template it was drawn on.
+
+    image equals base everywhere outside the dirty (left, top, right, bottom)
+    boxes, and base_key identifies base's pixels, so encoders can reuse work
+    done on the template. base is None for cards composited from scratch.
+    """
+    image: object
+    base: object
+    base_key: tuple
+    dirty: tuple
+
+def _text_block_boxes(compiled, block):
+    """Card-pixel boxes a text block draws into: its box if filled, and each text piece"""
+    boxes = []
+    if compiled.box_fill is not None:
+        # The rectangle's far edges are inclusive
+        boxes.append((block.box[0], block.box[1], block.box[2] + 1, block.box[3] + 1))
+    for (line_x, line_y, _), run in zip(block.lines, block.runs):
+        for (x, y), mask in run.static + run.variable:
+            boxes.append((line_x + x, line_y + y, line_x + x + mask.width, line_y + y + mask.height))
+    return boxes
+
+def render_gift_card(compiled, barcode_data, member_number, verification_code, card_number=1):
+    """Render a single gift card from a compiled layout, as a RenderedCard"""
+    layout = compiled.layout
+    with stage("barcode"):
+        barcode_image = generate_barcode(barcode_data, layout.barcode_width, layout.barcode_height)
+    barcode_x, barcode_y = compiled.barcode_origin(barcode_image.width, barcode_image.height)
+    barcode_box = (barcode_x, barcode_y, barcode_x + barcode_image.width, barcode_y + barcode_image.height)
+    with stage("layout"):
+        block = layout_text_block(compiled, member_number, verification_code, card_number)
+
+    if not compiled.opaque_background:
+        with stage("background"):
+            card = load_background_template(compiled.background_path).copy()
+        with stage("composite"):
+            barcode_image = barcode_image.convert("RGBA")
+            card.paste(barcode_image, (barcode_x, barcode_y), barcode_image)
+        with stage("text"):
+            draw = ImageDraw.Draw(card)
+            _draw_text_block(draw, compiled, block)
+        with stage("convert"):
+            return RenderedCard(image=card.convert("RGB"), base=None, base_key=None, dirty=())
+
+    with stage("background"):
+        base = load_background_base(compiled.background_path)
+        card = base.copy()
+    with stage("composite"):
+        card.paste(barcode_image, (barcode_x, barcode_y))
+    with stage("text"):
+        draw = ImageDraw.Draw(card)
+        _draw_text_block(draw, compiled, block)
+
+    dirty = (barcode_box,) + tuple(_text_block_boxes(compiled, block))
+    base_key = ("background", _template_key(compiled.background_path))
+    return RenderedCard(image=card, base=base, base_key=base_key, dirty=dirty)
+
+# --- Preview Rendering ---
+@dataclass(frozen=True)
+class PreviewSprite:
+    """One preview layer: its image, top-left canvas position and box in card pixels"""
+    image: object
+    position: tuple
+    card_box: tuple
+
+def _preview_scale(compiled, size):
+    """Horizontal and vertical factors from card pixels to preview pixels"""
+    return size[0] / compiled.size[0], size[1] / compiled.size[1]
+
+def _scale_box(box, scale):
+    x1, y1, x2, y2 = box
+    scale_x, scale_y = scale
+    return round(x1 * scale_x), round(y1 * scale_y), round(x2 * scale_x), round(y2 * scale_y)
+
+def preview_layer_keys(background_path, size, compiled=None):
+    """Content keys for the preview layers.
+
+    A layer whose key is unchanged can keep its sprite and only needs moving.
+    Without a compiled layout only the background layer is listed.
+    """
+    base = (_template_key(background_path), tuple(size))
+    keys = {"background": base}
+    if compiled is not None:
+        layout = compiled.layout
+        keys["barcode"] = base + (layout.barcode_width, layout.barcode_height)
+        keys["text"] = base + (
+            layout.font_family,
+            compiled.font_size,
+            compiled.box_fill,
+            compiled.text_color,
+            layout.text_alignment
+        )
+    return keys
+
+def preview_barcode_sprite(compiled, size, barcode_data):
+    """Barcode layer for a preview of the given size"""
+    layout = compiled.layout
+    barcode_image = generate_barcode(barcode_data, layout.barcode_width, layout.barcode_height)
+    barcode_x, barcode_y = compiled.barcode_origin(barcode_image.width, barcode_image.height)
+    card_box = (barcode_x, barcode_y, barcode_x + barcode_image.width, barcode_y + barcode_image.height)
+
+    x1, y1, x2, y2 = _scale_box(card_box, _preview_scale(compiled, size))
+    sprite = barcode_image.resize((max(1, x2 - x1), max(1, y2 - y1)), Image.Resampling.LANCZOS)
+    return PreviewSprite(image=sprite.convert("RGBA"), position=(x1, y1), card_box=card_box)
+
+def preview_text_sprite(compiled, size, member_number, verification_code, card_number=1):
+    """Text block layer (box and lines) for a preview of the given size"""
+    scale = _preview_scale(compiled, size)
+    block = layout_text_block(compiled, member_number, verification_code, card_number)
+    x1, y1, x2, y2 = _scale_box(block.box, scale)
+
+    # The box rectangle is inclusive of its far edges, like draw.rectangle
+    sprite = Image.new("RGBA", (x2 - x1 + 1, y2 - y1 + 1), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(sprite)
+    if compiled.box_fill is not None:
+        draw.rectangle([0, 0, x2 - x1, y2 - y1], fill=compiled.box_fill)
+
+    # Measured with the output font, drawn with a matching smaller one
+    font = get_font(compiled.layout.font_family, max(1, round(compiled.font_size * min(scale))))
+    for line_x, line_y, line in block.lines:
+        position = (round(line_x * scale[0]) - x1, round(line_y * scale[1]) - y1)
+        draw.text(position, line, font=font, fill=compiled.text_color)
+    return PreviewSprite(image=sprite, position=(x1, y1), card_box=block.box)
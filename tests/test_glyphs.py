@@ -0,0 +1,73 @@
+"""The glyph cache must draw card text exactly like ImageDraw.text.
+
+Its line assembly follows Pillow's basic layout internals, so these checks
+catch a Pillow upgrade that changes how text is placed or blended.
+"""
+import random
+import string
+
+import pytest
+from PIL import Image, ImageChops, ImageDraw, ImageFont, features
+
+from fonts import get_font
+from glyphs import GlyphCache
+from renderer import TEXT_LABELS
+
+SIZES = (9, 14, 18, 27, 40)
+VALUE_CHARACTERS = string.ascii_letters + string.digits + " -_./#()&'"
+
+def _values(seed, count=40):
+    rnd = random.Random(seed)
+    values = ["", " ", "0", "  lead", "trail  ", "AVAWAY", "ff fi fl", "Tj.Ty,"]
+    values += ["".join(rnd.choice(VALUE_CHARACTERS) for _ in range(rnd.randint(1, 14))) for _ in range(count)]
+    return values
+
+def _background(size):
+    """A card-like background with colour everywhere, so blending errors show"""
+    return Image.merge("RGB", (
+        Image.linear_gradient("L").resize(size),
+        Image.radial_gradient("L").resize(size),
+        Image.new("L", size, 90)
+    ))
+
+def _assert_matches_draw_text(font, label, value, origin=(7, 5)):
+    cache = GlyphCache(font)
+    run = cache.labelled(label, value)
+    text = label + value
+    assert run.text == text
+    assert run.bbox == font.getbbox(text)
+
+    expected = _background((400, 120))
+    ImageDraw.Draw(expected).text(origin, text, fill=(250, 240, 10), font=font)
+    actual = _background((400, 120))
+    draw = ImageDraw.Draw(actual)
+    for (x, y), mask in run.static + run.variable:
+        draw.bitmap((origin[0] + x, origin[1] + y), mask, fill=(250, 240, 10))
+    assert ImageChops.difference(expected, actual).getbbox() is None, repr(text)
+
+@pytest.mark.parametrize("size", SIZES)
+def test_labelled_runs_match_draw_text(size):
+    font = get_font("Arial", size)
+    for label in TEXT_LABELS + ("",):
+        for value in _values(size):
+            _assert_matches_draw_text(font, label, value)
+
+def test_get_font_uses_basic_layout():
+    font = get_font("Arial", 18)
+    if isinstance(font, ImageFont.FreeTypeFont):
+        assert font.layout_engine == ImageFont.Layout.BASIC
+        assert GlyphCache(font).assembles
+
+@pytest.mark.skipif(not features.check("raqm"), reason="libraqm is not installed")
+def test_raqm_fonts_draw_whole_lines():
+    font = ImageFont.truetype(get_font("Arial", 18).path, 18, layout_engine=ImageFont.Layout.RAQM)
+    assert not GlyphCache(font).assembles
+    for value in _values(1, count=10):
+        _assert_matches_draw_text(font, "Card Number: ", value)
+
+@pytest.mark.skipif(not hasattr(ImageFont, "load_default_imagefont"), reason="needs Pillow 10.1")
+def test_bitmap_font_draws_whole_lines():
+    font = ImageFont.load_default_imagefont()
+    assert not GlyphCache(font).assembles
+    for value in _values(2, count=10):
+        _assert_matches_draw_text(font, "PIN: ", value)
@@ -0,0 +1,74 @@
+"""StripEncoder output must decode to exactly the card it was given.
+
+The encoder writes PNG filtering, deflate framing and the Adler-32 itself,
+so these checks run random cards through it and decode them with Pillow.
+"""
+import io
+import random
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from pngstrips import StripEncoder, filter_band
+
+SIZES = ((1, 1), (1, 40), (37, 1), (97, 61), (320, 203))
+STRIP_ROWS = (1, 7, 32, 100)
+COMPRESS_LEVELS = (0, 1, 6, 9)
+
+def _random_image(rnd, size):
+    return Image.frombytes("RGB", size, rnd.randbytes(size[0] * size[1] * 3))
+
+def _random_box(rnd, size):
+    """A (left, top, right, bottom) box that may reach past the image edges"""
+    width, height = size
+    left, top = rnd.randint(-5, width - 1), rnd.randint(-5, height - 1)
+    return left, top, rnd.randint(left + 1, width + 5), rnd.randint(top + 1, height + 5)
+
+def _card(rnd, base, base_key, boxes):
+    """A card like renderer.RenderedCard: base with random pixels inside the dirty boxes"""
+    image = base.copy()
+    for box in boxes:
+        left, top = max(0, box[0]), max(0, box[1])
+        right, bottom = min(box[2], base.width), min(box[3], base.height)
+        if right > left and bottom > top:
+            image.paste(_random_image(rnd, (right - left, bottom - top)), (left, top))
+    return SimpleNamespace(image=image, base=base, base_key=base_key, dirty=tuple(boxes))
+
+def _decode(data):
+    with Image.open(io.BytesIO(data)) as decoded:
+        decoded.load()
+        return decoded.mode, decoded.size, decoded.tobytes()
+
+@pytest.mark.parametrize("compress_level", COMPRESS_LEVELS)
+@pytest.mark.parametrize("strip_rows", STRIP_ROWS)
+def test_random_cards_round_trip(strip_rows, compress_level):
+    rnd = random.Random(strip_rows * 100 + compress_level)
+    encoder = StripEncoder(strip_rows=strip_rows, compress_level=compress_level)
+    for size in SIZES:
+        base = _random_image(rnd, size)
+        cards = [_card(rnd, base, size, ())]
+        cards += [_card(rnd, base, size, [_random_box(rnd, size) for _ in range(rnd.randint(1, 4))]) for _ in range(5)]
+        for card in cards:
+            assert _decode(encoder.encode(card)) == ("RGB", size, card.image.tobytes())
+
+def test_template_bands_are_kept_per_key():
+    rnd = random.Random(3)
+    encoder = StripEncoder(strip_rows=16)
+    first, second = _random_image(rnd, (64, 50)), _random_image(rnd, (64, 50))
+    for _ in range(2):
+        for key, base in (("first", first), ("second", second)):
+            card = _card(rnd, base, key, [_random_box(rnd, base.size)])
+            assert _decode(encoder.encode(card))[2] == card.image.tobytes()
+
+def test_filter_band_matches_png_filters():
+    rnd = random.Random(5)
+    band = _random_image(rnd, (9, 4))
+    raw = band.tobytes()
+    stride = band.width * 3
+    expected = bytearray([1])
+    expected += bytes((raw[i] - (raw[i - 3] if i >= 3 else 0)) % 256 for i in range(stride))
+    for row in range(1, band.height):
+        expected.append(2)
+        expected += bytes((raw[row * stride + i] - raw[(row - 1) * stride + i]) % 256 for i in range(stride))
+    assert filter_band(band) == bytes(expected)
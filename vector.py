@@ -0,0 +1,339 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from xml.sax.saxutils import escape, quoteattr
+import os
+import re
+import zlib
+
+from PIL import ImageFont
+
+from imposition import PDFPageStream
+from renderer import (
+    barcode_image_size, card_filename, code128_bars, compile_layout, encode_code128, format_barcode_data,
+    layout_text_block, load_background_base
+)
+
+# --- Vector Card Output ---
+# Cards as vector drawings instead of PNGs. The background is embedded once
+# and shared by every card; the barcode, text box and text are drawn over it
+# as rectangles and text in the card's font, at the positions the raster
+# renderer uses (code128_bars and layout_text_block), so bars print sharp at
+# any resolution. "svg" writes one small SVG per card that links a single
+# background image in the output folder; "pdf" streams every card as a page
+# of one PDF that references the background and the embedded font once.
+# Nothing is rasterized, so cards are built in the batch process itself.
+
+VECTOR_FORMATS = ("svg", "pdf")
+VECTOR_BASENAME = "gift_cards"             # gift_cards.pdf
+BACKGROUND_FILENAME = "gift_cards_background.png"  # Shared by the SVG cards
+MM_PER_INCH = 25.4
+
+# Single-byte text encoding of the embedded PDF font; other characters print as "?"
+PDF_TEXT_ENCODING = "cp1252"
+PDF_FIRST_CHAR = 32
+PDF_LAST_CHAR = 255
+
+@dataclass(frozen=True)
+class VectorSettings:
+    """Vector output options for a batch"""
+    enabled: bool = False
+    format: str = "pdf"
+    dpi: int = 300  # Card pixels per inch, which sets the printed size
+    compress_level: int = 6
+
+    @classmethod
+    def from_config(cls, config):
+        """Build settings from the "vector" section of config.json"""
+        vector = config.get('vector', {})
+        return cls(
+            enabled=bool(vector.get('enabled', False)),
+            format=str(vector.get('format', "pdf")).lower(),
+            dpi=int(vector.get('dpi', 300)),
+            compress_level=int(vector.get('compress_level', 6))
+        )
+
+@dataclass(frozen=True)
+class VectorCard:
+    """One card as drawing primitives in card pixels, y pointing down.
+
+    Boxes are (left, top, right, bottom) with exclusive far edges; lines are
+    (x, baseline y, text).
+    """
+    barcode_box: tuple
+    bars: tuple
+    text_box: tuple  # None without a text background
+    lines: tuple
+
+def vector_card(compiled, barcode_data, member_number, verification_code, card_number=1):
+    """Lay out a card's barcode and text like render_gift_card, without drawing them"""
+    layout = compiled.layout
+    modules = encode_code128(format_barcode_data(barcode_data))
+    width, height = barcode_image_size(len(modules), layout.barcode_width, layout.barcode_height)
+    barcode_x, barcode_y = compiled.barcode_origin(width, height)
+    bars = tuple(
+        (barcode_x + left, barcode_y + top, barcode_x + right, barcode_y + bottom)
+        for left, top, right, bottom in code128_bars(modules, width, height)
+    )
+
+    block = layout_text_block(compiled, member_number, verification_code, card_number)
+    text_box = None
+    if compiled.box_fill is not None:
+        text_box = (block.box[0], block.box[1], block.box[2] + 1, block.box[3] + 1)
+    # Pillow draws text from the top of the ascender; vector text sits on its baseline
+    ascent = compiled.font.getmetrics()[0]
+    return VectorCard(
+        barcode_box=(barcode_x, barcode_y, barcode_x + width, barcode_y + height),
+        bars=bars,
+        text_box=text_box,
+        lines=tuple((line_x, line_y + ascent, text) for line_x, line_y, text in block.lines)
+    )
+
+def _hex_color(rgb):
+    return "#{:02x}{:02x}{:02x}".format(*rgb[:3])
+
+def _rgb_operator(rgb, operator):
+    """PDF color operator for an 8-bit RGB color"""
+    return "{:.3f} {:.3f} {:.3f} {}".format(*(c / 255 for c in rgb[:3]), operator)
+
+# --- SVG ---
+def card_svg(card, compiled, dpi, background_href):
+    """SVG document of a card, linking its background image"""
+    width, height = compiled.size
+    font_family = quoteattr(f"'{compiled.font.getname()[0]}', {compiled.layout.font_family}, sans-serif")
+    bars = "".join(f"M{left} {top}h{right - left}v{bottom - top}h{left - right}z" for left, top, right, bottom in card.bars)
+    left, top, right, bottom = card.barcode_box
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+        f'width="{width / dpi * MM_PER_INCH:.2f}mm" height="{height / dpi * MM_PER_INCH:.2f}mm" '
+        f'viewBox="0 0 {width} {height}">',
+        f'<image width="{width}" height="{height}" xlink:href={quoteattr(background_href)}/>',
+        f'<rect x="{left}" y="{top}" width="{right - left}" height="{bottom - top}" fill="#fff"/>',
+        f'<path d="{bars}" fill="#000"/>'
+    ]
+    if card.text_box is not None:
+        left, top, right, bottom = card.text_box
+        parts.append(
+            f'<rect x="{left}" y="{top}" width="{right - left}" height="{bottom - top}" '
+            f'fill="{_hex_color(compiled.box_fill)}"/>'
+        )
+    parts.append(
+        f'<g font-family={font_family} font-size="{compiled.font_size}" '
+        f'fill="{_hex_color(compiled.text_color)}" xml:space="preserve">'
+    )
+    parts.extend(f'<text x="{x}" y="{y}">{escape(text)}</text>' for x, y, text in card.lines)
+    parts.append('</g></svg>\n')
+    return "\n".join(parts)
+
+class SVGCardWriter:
+    """Write one SVG per card next to a single shared background PNG"""
+
+    def __init__(self, settings, compiled, output_path):
+        self.settings = settings
+        self.compiled = compiled
+        self.output_path = output_path
+        self.path = output_path
+        self.count = 0
+        load_background_base(compiled.background_path).save(
+            os.path.join(output_path, BACKGROUND_FILENAME), "PNG", compress_level=settings.compress_level
+        )
+
+    def add(self, card_number, member_number, card):
+        """Write a card's SVG, returning its file name"""
+        filename = os.path.splitext(card_filename(member_number, card_number))[0] + ".svg"
+        with open(os.path.join(self.output_path, filename), 'w', encoding='utf-8') as f:
+            f.write(card_svg(card, self.compiled, self.settings.dpi, BACKGROUND_FILENAME))
+        self.count += 1
+        return filename
+
+    def close(self):
+        pass
+
+# --- PDF ---
+@lru_cache(maxsize=8)
+def _font_widths(font_path, font_index):
+    """Advance widths in 1/1000 em of the PDF font's character codes"""
+    font = ImageFont.truetype(font_path, 1000, index=font_index)
+    widths = []
+    for code in range(PDF_FIRST_CHAR, PDF_LAST_CHAR + 1):
+        try:
+            char = bytes([code]).decode(PDF_TEXT_ENCODING)
+        except UnicodeDecodeError:
+            widths.append(0)
+            continue
+        widths.append(round(font.getlength(char)))
+    return font, widths
+
+def _pdf_string(text):
+    """PDF literal string of text in the font's single-byte encoding"""
+    data = text.encode(PDF_TEXT_ENCODING, errors="replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+class VectorPDFStream(PDFPageStream):
+    """PDFPageStream whose pages draw vector content over shared resources"""
+
+    def add_image(self, image):
+        """Embed an RGB image once, returning its object id"""
+        pixels = zlib.compress(image.tobytes(), self.compress_level)
+        image_id = self._allocate()
+        self._write_object(
+            image_id,
+            (f"<< /Type /XObject /Subtype /Image /Width {image.width} /Height {image.height} "
+             f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /FlateDecode /Length {len(pixels)} >>").encode("ascii"),
+            pixels
+        )
+        return image_id
+
+    def add_font(self, font):
+        """Embed a TrueType font once, returning its object id.
+
+        Fonts that can't be embedded as a simple TrueType font (collections,
+        CFF-based OpenType files and Pillow's built-in font, which has no
+        file) fall back to the built-in Helvetica.
+        """
+        font_id = self._allocate()
+        if not isinstance(font.path, str) or not font.path.lower().endswith(".ttf"):
+            self._write_object(
+                font_id,
+                b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"
+            )
+            return font_id
+
+        metrics_font, widths = _font_widths(font.path, font.index)
+        ascent, descent = metrics_font.getmetrics()
+        cap_top = metrics_font.getbbox("H")[1]
+        name = re.sub(r"[^A-Za-z0-9-]", "", "-".join(font.getname())) or "EmbeddedFont"
+        with open(font.path, 'rb') as f:
+            font_data = f.read()
+        compressed = zlib.compress(font_data, self.compress_level)
+
+        file_id, descriptor_id = self._allocate(), self._allocate()
+        self._write_object(
+            file_id,
+            f"<< /Length {len(compressed)} /Length1 {len(font_data)} /Filter /FlateDecode >>".encode("ascii"),
+            compressed
+        )
+        self._write_object(
+            descriptor_id,
+            (f"<< /Type /FontDescriptor /FontName /{name} /Flags 32 /FontBBox [0 {-descent} 1000 {ascent}] "
+             f"/ItalicAngle 0 /Ascent {ascent} /Descent {-descent} /CapHeight {ascent - cap_top} /StemV 80 "
+             f"/FontFile2 {file_id} 0 R >>").encode("ascii")
+        )
+        self._write_object(
+            font_id,
+            (f"<< /Type /Font /Subtype /TrueType /BaseFont /{name} /FirstChar {PDF_FIRST_CHAR} "
+             f"/LastChar {PDF_LAST_CHAR} /Widths [{' '.join(str(width) for width in widths)}] "
+             f"/Encoding /WinAnsiEncoding /FontDescriptor {descriptor_id} 0 R >>").encode("ascii")
+        )
+        return font_id
+
+    def add_vector_page(self, size, content, resources):
+        """Append a page of size card pixels; content draws in pixels with y pointing up"""
+        width_pt = size[0] * 72 / self.dpi
+        height_pt = size[1] * 72 / self.dpi
+        stream = zlib.compress(f"{72 / self.dpi:.6f} 0 0 {72 / self.dpi:.6f} 0 0 cm\n".encode("ascii") + content, self.compress_level)
+
+        content_id, page_id = self._allocate(), self._allocate()
+        self._write_object(content_id, f"<< /Length {len(stream)} /Filter /FlateDecode >>".encode("ascii"), stream)
+        self._write_object(
+            page_id,
+            (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width_pt:.3f} {height_pt:.3f}] "
+             f"/Resources {resources} /Contents {content_id} 0 R >>").encode("ascii")
+        )
+        self._page_ids.append(page_id)
+
+def card_pdf_content(card, compiled):
+    """PDF content stream operators drawing a card in card pixels over the /Bg image"""
+    width, height = compiled.size
+
+    def rect(box):
+        # PDF's y axis points up
+        left, top, right, bottom = box
+        return f"{left} {height - bottom} {right - left} {bottom - top} re"
+
+    ops = [f"q {width} 0 0 {height} 0 0 cm /Bg Do Q", "1 1 1 rg", rect(card.barcode_box), "f", "0 0 0 rg"]
+    ops.extend(rect(bar) for bar in card.bars)
+    ops.append("f")
+    if card.text_box is not None:
+        ops.extend([_rgb_operator(compiled.box_fill, "rg"), rect(card.text_box), "f"])
+    ops.append(f"BT /F1 {compiled.font_size} Tf {_rgb_operator(compiled.text_color, 'rg')}")
+    content = "\n".join(ops).encode("ascii")
+    for x, y, text in card.lines:
+        content += f"\n1 0 0 1 {x} {height - y} Tm ".encode("ascii") + _pdf_string(text) + b" Tj"
+    return content + b"\nET\n"
+
+class PDFCardWriter:
+    """Stream every card as a page of one PDF sharing the background and font"""
+
+    def __init__(self, settings, compiled, output_path):
+        self.compiled = compiled
+        self.path = os.path.join(output_path, VECTOR_BASENAME + ".pdf")
+        self.count = 0
+        self._stream = VectorPDFStream(self.path, settings.dpi, settings.compress_level)
+        background_id = self._stream.add_image(load_background_base(compiled.background_path))
+        font_id = self._stream.add_font(compiled.font)
+        self._resources = f"<< /XObject << /Bg {background_id} 0 R >> /Font << /F1 {font_id} 0 R >> >>"
+
+    def add(self, card_number, member_number, card):
+        """Append a card's page, returning its "file p.N" location"""
+        self._stream.add_vector_page(self.compiled.size, card_pdf_content(card, self.compiled), self._resources)
+        self.count += 1
+        return f"{os.path.basename(self.path)} p.{self.count}"
+
+    def close(self):
+        self._stream.close()
+
+# --- Batch Sink ---
+def validate_vector(settings, compiled):
+    """Raise ValueError if cards of this compiled layout can't be written as vectors.
+
+    Text needs a scalable font for its metrics and name; Pillow's bitmap
+    fallback font (used when no font file is found and FreeType has no
+    built-in font) has neither.
+    """
+    if settings.format not in VECTOR_FORMATS:
+        raise ValueError(f"Unknown vector format: {settings.format} (choose from {', '.join(VECTOR_FORMATS)})")
+    if not isinstance(compiled.font, ImageFont.FreeTypeFont):
+        raise ValueError(
+            f"Vector cards need a TrueType or OpenType font, but no font file was found for "
+            f"\"{compiled.layout.font_family}\"; set font_family to a font file path"
+        )
+
+class VectorSink:
+    """Lay out rows as vector cards and hand them to the SVG or PDF writer"""
+
+    def __init__(self, settings, layout, background_path, output_path):
+        self.settings = settings
+        self.compiled = compile_layout(layout, background_path)
+        validate_vector(settings, self.compiled)
+        writer_class = SVGCardWriter if settings.format == "svg" else PDFCardWriter
+        self._writer = writer_class(settings, self.compiled, output_path)
+
+    @property
+    def path(self):
+        return self._writer.path
+
+    @property
+    def count(self):
+        return self._writer.count
+
+    def add(self, row):
+        """Write one (card_number, barcode_data, member_number, verification_code) row"""
+        card_number, barcode_data, member_number, verification_code = row
+        card = vector_card(self.compiled, barcode_data, member_number, verification_code, card_number)
+        return self._writer.add(card_number, member_number, card)
+
+    def close(self):
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def describe_vector(vector, settings):
+    """Format the stats["vector"] entry of a batch for the log"""
+    path, count = vector
+    if settings.format == "svg":
+        return f"✒️ Wrote {count} SVG cards to {path}, sharing {BACKGROUND_FILENAME}"
+    return f"✒️ Wrote {count} vector cards to {path}"